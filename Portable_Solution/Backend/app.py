@@ -1,40 +1,210 @@
 import os
-from flask import Flask, jsonify
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from data_utils import fetch_data_from_supabase, get_last_sync_timestamp, logger
+from data_utils import (
+    fetch_data_from_supabase, get_pool_stats, logger,
+    SNAPSHOT_CACHE, SNAPSHOT_REFRESH_INTERVAL, SNAPSHOT_STALE_AFTER, SNAPSHOT_HISTORY, TOPOLOGY_CACHE_CONTROL,
+    TOPOLOGY_STREAM_BUFFER, TOPOLOGY_HEARTBEAT, TOPOLOGY_WS_PORT
+)
+from snapshot_cache import Snapshot, SnapshotCache
+from snapshot_digest import compute_digests
+from topology_events import Event, EventBroadcaster
 
 app = Flask(__name__)
 
 CORS(app) 
 
+def serialize_snapshot(data):
+    """Same body jsonify() would send, produced once per refresh instead of once per request"""
+    return f"{app.json.dumps(data, separators=(',', ':'))}\n"
+
+# Streaming clients (SSE and websocket) subscribe here
+topology_events = EventBroadcaster(buffer_size=TOPOLOGY_STREAM_BUFFER)
+
+def broadcast_change(previous, snapshot):
+    """Publish each new version as one delta event, serialized once for every client"""
+    if previous is not None:
+        topology_events.publish(Event("topology", snapshot.version, snapshot_cache.delta_since(previous.version, snapshot)))
+
+def topology_event(since):
+    """Catch-up event for a client at version since: a delta, or the full snapshot"""
+    snapshot = snapshot_cache.snapshot
+    return Event("topology", snapshot.version, snapshot_cache.delta_since(since, snapshot))
+
+# One background worker fetches from Supabase; requests are answered from its last snapshot
+snapshot_cache = SnapshotCache(
+    fetch_data_from_supabase, refresh_interval=SNAPSHOT_REFRESH_INTERVAL,
+    stale_after=SNAPSHOT_STALE_AFTER, serialize=serialize_snapshot, history_size=SNAPSHOT_HISTORY,
+    on_change=broadcast_change
+)
+
+# Without SNAPSHOT_CACHE the version endpoint fetches directly and numbers the content digests itself
+direct_snapshot = None
+direct_snapshot_lock = threading.Lock()
+
+def fetch_direct_snapshot():
+    """Snapshot of a direct fetch (without body) whose version only moves when the content digest changes"""
+    global direct_snapshot
+    data = fetch_data_from_supabase()
+    if not data:
+        return None
+    digest = compute_digests(data)["content"]
+    now = time.time()
+    with direct_snapshot_lock:
+        previous = direct_snapshot
+        if previous and digest == previous.digest:
+            direct_snapshot = Snapshot(data, None, now, previous.version, digest, previous.changed_at)
+        else:
+            version = previous.version + 1 if previous else int(now * 1000)
+            direct_snapshot = Snapshot(data, None, now, version, digest, now)
+        return direct_snapshot
+
+def snapshot_cache_disabled():
+    """503 for the endpoints that only exist on top of the snapshot cache"""
+    return jsonify({"error": "Not available with SNAPSHOT_CACHE=0"}), 503
+
+def conditional_response(etag, make_response):
+    """304 when the client already holds etag, otherwise make_response(); the body is never built for a 304"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = make_response()
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = TOPOLOGY_CACHE_CONTROL
+    return response
+
 @app.route('/api/topology_data', methods=['GET'])
 def get_topology_data():
     """
     API endpoint to fetch the latest topology data from Supabase.
     This data is then sent to the frontend for visualization.
+    With SNAPSHOT_CACHE it is served from the background-refreshed snapshot.
     """
+    if SNAPSHOT_CACHE:
+        snapshot = snapshot_cache.get()
+        if snapshot is None:
+            logger.error("No topology snapshot available yet.")
+            return jsonify({"error": "Failed to retrieve topology data"}), 503
+        # The body only changes with the content digest, so the digest is a strong validator
+        response = conditional_response(
+            snapshot.digest[:32], lambda: Response(snapshot.body, mimetype="application/json")
+        )
+        response.headers["X-Snapshot-Age"] = f"{snapshot_cache.age():.1f}"
+        if snapshot_cache.is_stale():
+            response.headers["X-Snapshot-Stale"] = "1"
+        return response
+
     logger.info("Received request for topology data.")
     data = fetch_data_from_supabase()
     if data:
         logger.info("Topology data fetched and ready to send.")
-        return jsonify(data), 200
+        response = jsonify(data)
+        response.add_etag()
+        response.headers["Cache-Control"] = TOPOLOGY_CACHE_CONTROL
+        return response.make_conditional(request)
     else:
         logger.error("Failed to retrieve topology data.")
         return jsonify({"error": "Failed to retrieve topology data"}), 500
 
+@app.route('/api/topology_delta', methods=['GET'])
+def get_topology_delta():
+    """
+    API endpoint returning only the components and connections that changed since ?since=<version>.
+    Without since, or when that version is too old, the full snapshot is returned with "full": true.
+    """
+    if not SNAPSHOT_CACHE:
+        return snapshot_cache_disabled()
+    snapshot = snapshot_cache.get()
+    if snapshot is None:
+        logger.error("No topology snapshot available yet.")
+        return jsonify({"error": "Failed to retrieve topology data"}), 503
+    since = request.args.get("since", type=int)
+    return conditional_response(
+        f"d{since}-{snapshot.version}",
+        lambda: Response(snapshot_cache.delta_since(since, snapshot), mimetype="application/json")
+    )
+
+@app.route('/api/topology_stream', methods=['GET'])
+def get_topology_stream():
+    """
+    Server-Sent Events stream of "topology" events, each shaped like a /api/topology_delta response.
+    The first event catches up from Last-Event-ID (or ?since=), later ones carry one version each.
+    """
+    if not SNAPSHOT_CACHE:
+        return snapshot_cache_disabled()
+    if snapshot_cache.get() is None:
+        logger.error("No topology snapshot available yet.")
+        return jsonify({"error": "Failed to retrieve topology data"}), 503
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = request.args.get("since", type=int)
+
+    def generate():
+        yield b"retry: 3000\n\n"
+        for event in topology_events.stream(topology_event, since, TOPOLOGY_HEARTBEAT):
+            yield event.sse if event else b": heartbeat\n\n"
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route('/api/last_sync_timestamp', methods=['GET'])
 def get_sync_timestamp():
     """
-    API endpoint to fetch only the last sync timestamp from the private_cloud table.
-    This is used by the frontend to efficiently check for updates.
+    API endpoint returning the snapshot version and when the topology last changed.
+    Both only move when the fetched content changes, and reading them writes nothing,
+    so the frontend polls this and downloads /api/topology_data only when the version moves.
+    Without SNAPSHOT_CACHE every request fetches from Supabase to compute them.
     """
-    logger.info("Received request for last sync timestamp.")
-    timestamp = get_last_sync_timestamp()
-    if timestamp is not None:
-        return jsonify({"last_sync": timestamp}), 200
+    snapshot = snapshot_cache.get() if SNAPSHOT_CACHE else fetch_direct_snapshot()
+    if snapshot is not None:
+        return conditional_response(
+            f"v{snapshot.version}", lambda: jsonify({"version": snapshot.version, "last_sync": snapshot.changed_at_iso()})
+        )
     else:
-        logger.warning("Could not retrieve last sync timestamp.")
-        return jsonify({"last_sync": None, "error": "Could not retrieve timestamp"}), 500
+        logger.warning("Could not retrieve snapshot version.")
+        return jsonify({"version": None, "last_sync": None, "error": "Could not retrieve timestamp"}), 500
+
+@app.route('/api/pool_stats', methods=['GET'])
+def get_supabase_pool_stats():
+    """
+    API endpoint exposing connection pool counters for the shared Supabase client.
+    A reused count that tracks the request count means no new handshakes on the hot path.
+    """
+    return jsonify(get_pool_stats()), 200
+
+@app.route('/api/snapshot_stats', methods=['GET'])
+def get_snapshot_stats():
+    """
+    API endpoint reporting the age of the cached topology snapshot and its refresh counters.
+    """
+    return jsonify({**snapshot_cache.stats(), "stream": topology_events.stats()}), 200
+
+
+def handle_topology_websocket(connection):
+    """Websocket variant of /api/topology_stream: one JSON text message per event, pings when idle"""
+    since = parse_qs(urlparse(connection.request.path).query).get("since", [None])[0]
+    if snapshot_cache.get() is None:
+        connection.close(1011, "No topology snapshot available")
+        return
+    try:
+        for event in topology_events.stream(topology_event, int(since) if since else None, TOPOLOGY_HEARTBEAT):
+            if event:
+                connection.send(event.text)
+            else:
+                connection.ping()
+    except Exception as e:
+        logger.info(f"Topology websocket client left: {e}")
+
+def start_websocket_server(port):
+    from websockets.sync.server import serve
+
+    server = serve(handle_topology_websocket, "0.0.0.0", port)
+    threading.Thread(target=server.serve_forever, name="topology-websocket", daemon=True).start()
+    logger.info(f"Topology websocket stream on ws://0.0.0.0:{port}/")
+    return server
 
 
 @app.route('/')
@@ -45,6 +215,11 @@ def home():
     return "Topology Backend is running. Access /api/topology_data for data or /api/last_sync_timestamp for timestamp.", 200
 
 if __name__ == '__main__':
+    # app.run(debug=True) re-executes this file in a reloader child; only the child serves requests
+    if TOPOLOGY_WS_PORT and not SNAPSHOT_CACHE:
+        logger.warning("TOPOLOGY_WS_PORT is ignored with SNAPSHOT_CACHE=0.")
+    elif TOPOLOGY_WS_PORT and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_websocket_server(TOPOLOGY_WS_PORT)
 
     app.run(host='0.0.0.0', port=5000, debug=True)
     logger.info("Flask backend started on http://0.0.0.0:5000")
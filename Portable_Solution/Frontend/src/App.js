@@ -1,6 +1,7 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import TopologyViewer from './components/TopologyViewer.js'; 
 import Legend from './components/Legend.js'; 
+import { applyDelta } from './topologyDelta.js';
 
 function App() {
   const [topologyData, setTopologyData] = useState(null); // Data currently being displayed
@@ -8,6 +9,7 @@ function App() {
   const [error, setError] = useState(null);
   const [backendUrl, setBackendUrl] = useState('http://localhost:5000'); // Default backend URL
   const [initialLoad, setInitialLoad] = useState(true); // Flag for the very first load
+  const loadedVersion = useRef(null); // Snapshot version of the data currently displayed
 
   // Function to fetch the full topology data from the backend
   const fetchTopologyData = useCallback(async () => {
@@ -24,24 +26,91 @@ function App() {
       }
       const data = await response.json();
       setTopologyData(data);
+      return true;
     } catch (e) {
       console.error("Failed to fetch topology data:", e);
       setError("Failed to load topology data. Please ensure the backend is running and accessible.");
+      return false;
     } finally {
       setFetchingNewData(false);
       setInitialLoad(false);
     }
   }, [backendUrl, topologyData]);
 
-  // Set up interval for periodic updates
+  // Poll the small version endpoint; download the full topology only when the version moves
+  const checkForUpdates = useCallback(async () => {
+    try {
+      const response = await fetch(`${backendUrl}/api/last_sync_timestamp`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      const { version } = await response.json();
+      if (version !== null && version === loadedVersion.current) {
+        return;
+      }
+      if (await fetchTopologyData()) {
+        loadedVersion.current = version;
+      }
+    } catch (e) {
+      console.error("Failed to check for topology updates:", e);
+      await fetchTopologyData();
+    }
+  }, [backendUrl, fetchTopologyData]);
+
+  // The stream effect below must not reconnect whenever checkForUpdates changes identity
+  const checkForUpdatesRef = useRef(checkForUpdates);
   useEffect(() => {
-    fetchTopologyData(); // Fetch immediately on component mount
+    checkForUpdatesRef.current = checkForUpdates;
+  }, [checkForUpdates]);
 
-    const intervalId = setInterval(fetchTopologyData, 5000); // Refresh every 5 seconds
+  // Live updates pushed over Server-Sent Events; falls back to polling if the stream is unavailable
+  useEffect(() => {
+    let intervalId = null;
+    const startPolling = () => {
+      if (intervalId === null) {
+        checkForUpdatesRef.current(); // Fetch immediately
+        intervalId = setInterval(() => checkForUpdatesRef.current(), 5000); // Check for updates every 5 seconds
+      }
+    };
 
-    // Clear interval on component unmount
-    return () => clearInterval(intervalId);
-  }, [fetchTopologyData]);
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+      return () => clearInterval(intervalId);
+    }
+
+    // The first event is the full snapshot (or, after a reconnect, everything since Last-Event-ID)
+    const source = new EventSource(`${backendUrl}/api/topology_stream`);
+    source.addEventListener('topology', (event) => {
+      const update = JSON.parse(event.data);
+      if (update.full) {
+        setTopologyData(update.data);
+      } else if (update.since === loadedVersion.current) {
+        setTopologyData((current) => applyDelta(current, update));
+      } else {
+        // Out of step with the stream: reload the full topology
+        loadedVersion.current = null;
+        checkForUpdatesRef.current();
+        return;
+      }
+      loadedVersion.current = update.version;
+      setError(null);
+      setInitialLoad(false);
+    });
+    source.onerror = () => {
+      // EventSource retries on its own unless the server refused the stream
+      if (source.readyState === EventSource.CLOSED) {
+        startPolling();
+      }
+    };
+
+    // Close the stream and any polling on unmount or backend change
+    return () => {
+      source.close();
+      if (intervalId !== null) {
+        clearInterval(intervalId);
+      }
+    };
+  }, [backendUrl]);
 
   return (
     <div className="min-h-screen bg-gray-100 flex flex-col items-center p-4 font-inter">
@@ -0,0 +1,48 @@
+// Applies a /api/topology_delta (or /api/topology_stream) delta to a topology snapshot.
+// Mirrors apply_delta() in topology_delta.py; the input snapshot is not modified.
+export function applyDelta(data, delta) {
+  const result = { ...data };
+  if ('private_cloud' in delta) {
+    result.private_cloud = delta.private_cloud;
+  }
+  Object.entries(delta.sections || {}).forEach(([section, changes]) => {
+    const byId = new Map((data[section] || []).map((comp) => [comp.id, comp]));
+    (changes.removed || []).forEach((id) => byId.delete(id));
+
+    // Copy a component (and its connections) the first time the delta touches it
+    const touched = new Set();
+    const copy = (id) => {
+      if (!touched.has(id)) {
+        const comp = { ...byId.get(id) };
+        if (comp.connected_switches) comp.connected_switches = [...comp.connected_switches];
+        if (comp.connected_components) comp.connected_components = { ...comp.connected_components };
+        byId.set(id, comp);
+        touched.add(id);
+      }
+      return byId.get(id);
+    };
+
+    (changes.changed || []).forEach((entry) => Object.assign(copy(entry.id), entry));
+    (changes.connections_removed || []).forEach((entry) => {
+      const comp = copy(entry.id);
+      if (section === 'network_switches') {
+        if (comp.connected_components) delete comp.connected_components[entry.port];
+      } else {
+        comp.connected_switches = (comp.connected_switches || []).filter(
+          (conn) => conn.switch_id !== entry.switch_id || conn.port !== entry.port
+        );
+      }
+    });
+    (changes.connections_added || []).forEach((entry) => {
+      const comp = copy(entry.id);
+      if (section === 'network_switches') {
+        comp.connected_components = { ...comp.connected_components, [entry.port]: entry.component_id };
+      } else {
+        comp.connected_switches = [...(comp.connected_switches || []), { switch_id: entry.switch_id, port: entry.port }];
+      }
+    });
+    (changes.added || []).forEach((comp) => byId.set(comp.id, comp));
+    result[section] = [...byId.values()];
+  });
+  return result;
+}
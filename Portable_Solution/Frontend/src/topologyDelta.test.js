@@ -0,0 +1,78 @@
+import { applyDelta } from './topologyDelta';
+
+// Same topology and deltas as tests/test_topology_delta.py, which produces them with diff_snapshots()
+const snapshot = () => ({
+  private_cloud: { id: 1, name: 'HPE Private Cloud' },
+  servers: [
+    {
+      id: 'srv-1', health: 'Healthy',
+      connected_switches: [{ switch_id: 'sw-1', port: '1' }, { switch_id: 'sw-2', port: '1' }],
+    },
+    { id: 'srv-2', health: 'Critical', connected_switches: [{ switch_id: 'sw-1', port: '2' }] },
+    { id: 'srv-3', health: 'Healthy', connected_switches: [] },
+  ],
+  network_switches: [
+    { id: 'sw-1', health: 'Healthy', connected_components: { 1: 'srv-1', 2: 'srv-2' } },
+    { id: 'sw-2', health: 'Healthy', connected_components: { 1: 'srv-1', 2: 'st-1' } },
+  ],
+  storage: [{ id: 'st-1', health: 'Healthy', connected_switches: [{ switch_id: 'sw-2', port: '2' }] }],
+  backup: [],
+});
+
+test('applies field changes without modifying the input', () => {
+  const old = snapshot();
+  const result = applyDelta(old, {
+    private_cloud: { id: 1, name: 'Renamed' },
+    sections: { servers: { changed: [{ id: 'srv-2', health: 'Healthy' }] } },
+  });
+  const expected = snapshot();
+  expected.private_cloud.name = 'Renamed';
+  expected.servers[1].health = 'Healthy';
+  expect(result).toEqual(expected);
+  expect(old).toEqual(snapshot());
+});
+
+test('applies added and removed components', () => {
+  const srv4 = { id: 'srv-4', health: 'Warning', connected_switches: [{ switch_id: 'sw-2', port: '3' }] };
+  const result = applyDelta(snapshot(), {
+    sections: {
+      servers: { added: [srv4], removed: ['srv-3'] },
+      network_switches: { connections_added: [{ id: 'sw-2', port: '3', component_id: 'srv-4' }] },
+    },
+  });
+  const expected = snapshot();
+  expected.servers = [expected.servers[0], expected.servers[1], srv4];
+  expected.network_switches[1].connected_components['3'] = 'srv-4';
+  expect(result).toEqual(expected);
+});
+
+test('moves a connection between switches', () => {
+  const old = snapshot();
+  const result = applyDelta(old, {
+    sections: {
+      servers: {
+        connections_added: [{ id: 'srv-1', switch_id: 'sw-2', port: '4' }],
+        connections_removed: [{ id: 'srv-1', switch_id: 'sw-1', port: '1' }],
+      },
+      network_switches: {
+        connections_added: [{ id: 'sw-2', port: '4', component_id: 'srv-1' }],
+        connections_removed: [{ id: 'sw-1', port: '1', component_id: 'srv-1' }],
+      },
+    },
+  });
+  const expected = snapshot();
+  expected.servers[0].connected_switches = [{ switch_id: 'sw-2', port: '1' }, { switch_id: 'sw-2', port: '4' }];
+  delete expected.network_switches[0].connected_components['1'];
+  expected.network_switches[1].connected_components['4'] = 'srv-1';
+  expect(result).toEqual(expected);
+  expect(old).toEqual(snapshot());
+});
+
+test('removes a connection from a switch without connected_components', () => {
+  const data = snapshot();
+  delete data.network_switches[0].connected_components;
+  const result = applyDelta(data, {
+    sections: { network_switches: { connections_removed: [{ id: 'sw-1', port: '1', component_id: 'srv-1' }] } },
+  });
+  expect(result.network_switches[0]).toEqual({ id: 'sw-1', health: 'Healthy' });
+});
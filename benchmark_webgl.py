@@ -0,0 +1,104 @@
+"""
+SVG (Scatter) versus WebGL (Scattergl) benchmark for the interactive topology.
+
+For each size a synthetic fleet is laid out and rendered both ways, and the
+script reports figure build time, HTML size and, when playwright with a
+Chromium build is installed, frame-ready time: the time from navigation
+until Plotly.newPlot has resolved and the next frame is painted in headless
+Chromium. plotly.js is inlined so the browser timing does not depend on the
+CDN.
+
+    python benchmark_webgl.py                 # 1k, 10k and 50k nodes
+    python benchmark_webgl.py 2000 20000      # custom sizes
+
+playwright is optional (pip install playwright && playwright install chromium).
+Set BENCHMARK_CHROMIUM to a Chrome/Chromium executable to use that instead of
+playwright's own download.
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import plotly.io as pio
+from data_sources import SyntheticSource
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+
+# Chrome/Chromium executable for the frame-ready timing; playwright's bundled Chromium when unset
+CHROMIUM_PATH = os.getenv("BENCHMARK_CHROMIUM") or None
+
+# Components per server in SyntheticSource: 1 + 1/40 switches + 1/10 storage + 1/50 backup
+NODES_PER_SERVER = 1.145
+
+# Runs once Plotly.newPlot has resolved; the extra animation frame waits for the first paint
+FRAME_READY_SCRIPT = "requestAnimationFrame(() => { window.frameReadyMs = performance.now(); });"
+
+
+def frame_ready_ms(html_path, browser):
+    """Milliseconds from navigation start until the figure has been drawn"""
+    page = browser.new_page()
+    try:
+        page.goto(f"file://{html_path}", wait_until="commit", timeout=600000)
+        page.wait_for_function("window.frameReadyMs !== undefined", timeout=600000)
+        return page.evaluate("window.frameReadyMs")
+    finally:
+        page.close()
+
+
+def launch_browser():
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        logger.warning("playwright is not installed; frame-ready time will not be measured")
+        return None, None
+    playwright = sync_playwright().start()
+    try:
+        return playwright, playwright.chromium.launch(
+            executable_path=CHROMIUM_PATH, args=["--use-gl=swiftshader", "--enable-webgl"]
+        )
+    except Exception as e:
+        logger.warning(f"Could not launch Chromium ({e}); frame-ready time will not be measured")
+        playwright.stop()
+        return None, None
+
+
+def run(sizes):
+    import combined_topology
+
+    playwright, browser = launch_browser()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            data = SyntheticSource(servers=max(1, round(size / NODES_PER_SERVER))).load()
+            nodes = combined_topology.component_count(data)
+            for mode, webgl in (("svg", False), ("webgl", True)):
+                output_path = os.path.join(tmp_dir, f"topology_{size}_{mode}.html")
+                start = time.perf_counter()
+                fig = combined_topology.build_interactive_figure(
+                    data, output_path, use_position_cache=False, webgl=webgl
+                )
+                html = pio.to_html(fig, full_html=True, include_plotlyjs=True, validate=False,
+                                   post_script=FRAME_READY_SCRIPT)
+                build_ms = (time.perf_counter() - start) * 1000
+                with open(output_path, "w", encoding="utf-8") as f:
+                    f.write(html)
+                ready_ms = frame_ready_ms(output_path, browser) if browser else None
+                rows.append((nodes, mode, build_ms, len(html.encode("utf-8")), ready_ms))
+                logger.info(f"{nodes} nodes {mode}: built in {build_ms:.0f} ms")
+    if browser:
+        browser.close()
+        playwright.stop()
+
+    print(f"{'nodes':>7} {'mode':>6} {'build ms':>9} {'HTML MB':>8} {'frame-ready ms':>15}")
+    for nodes, mode, build_ms, size_bytes, ready_ms in rows:
+        ready = f"{ready_ms:.0f}" if ready_ms is not None else "n/a"
+        print(f"{nodes:>7} {mode:>6} {build_ms:>9.0f} {size_bytes / 1e6:>8.2f} {ready:>15}")
+    return rows
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,159 @@
+"""
+Push-based topology updates.
+
+ChangeFeedMonitor replaces the fixed-interval DatabaseMonitor poll: a change
+source pushes row-level INSERT/UPDATE/DELETE events, they are applied to an
+in-memory snapshot (delta_sync.IncrementalSync) and the outputs are
+regenerated only when the snapshot actually changed. Bursts of events are
+coalesced with a short debounce. If the source cannot connect or drops for
+good, the monitor hands over to a polling fallback (normally DatabaseMonitor).
+
+Sources:
+- RealtimeChangeSource:  Supabase Realtime postgres_changes
+- WebSocketChangeSource: plain websocket sending JSON row events, for local
+  runs and tests without the hosted project. Each message looks like
+  {"table": "servers", "type": "UPDATE", "record": {...}, "old_record": {...}}
+"""
+import json
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimeChangeSource:
+    def __init__(self, url, key, tables, schema="public", channel_name="topology-changes"):
+        self.url = url
+        self.key = key
+        self.tables = list(tables)
+        self.schema = schema
+        self.channel_name = channel_name
+
+    def _dispatch(self, payload, emit):
+        # postgres_changes payloads wrap the row event in "data"
+        change = payload.get("data", payload)
+        emit(change.get("table"), change.get("type", ""), change.get("record"), change.get("old_record"))
+
+    async def run(self, emit, on_subscribed, stop_event):
+        from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+        client = AsyncRealtimeClient(f"{self.url}/realtime/v1", self.key, auto_reconnect=True)
+        await client.connect()
+        channel = client.channel(self.channel_name)
+        for table in self.tables:
+            channel.on_postgres_changes(
+                "*", table=table, schema=self.schema,
+                callback=lambda payload: self._dispatch(payload, emit)
+            )
+
+        def _on_state(state, error):
+            if state == RealtimeSubscribeStates.SUBSCRIBED:
+                on_subscribed()
+            elif error:
+                logger.error(f"Realtime subscription {state}: {error}")
+
+        await channel.subscribe(_on_state)
+        try:
+            while not stop_event.is_set():
+                if not client.is_connected:
+                    raise ConnectionError("Realtime connection lost")
+                await asyncio.sleep(0.5)
+        finally:
+            await client.close()
+
+
+class WebSocketChangeSource:
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+
+    async def run(self, emit, on_subscribed, stop_event):
+        import websockets
+
+        async with websockets.connect(self.ws_url) as ws:
+            on_subscribed()
+            while not stop_event.is_set():
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                change = json.loads(message)
+                emit(change.get("table"), change.get("type", ""), change.get("record"), change.get("old_record"))
+
+
+class ChangeFeedMonitor:
+    def __init__(self, update_function, source, store, fallback=None, debounce=0.2):
+        self.update_function = update_function
+        self.source = source
+        self.store = store
+        self.fallback = fallback
+        self.debounce = debounce
+        self.running = False
+        self.events_applied = 0
+        self._dirty = threading.Event()
+        self._resync = threading.Event()
+        self._stop = threading.Event()
+        self._feed_thread = None
+        self._render_thread = None
+
+    def start(self):
+        self.running = True
+        self._stop.clear()
+        self.update_function(self.store.sync())
+        self._render_thread = threading.Thread(target=self._render_loop, daemon=True)
+        self._render_thread.start()
+        self._feed_thread = threading.Thread(target=self._feed_loop, daemon=True)
+        self._feed_thread.start()
+        logger.info("Change feed monitoring started.")
+
+    def _on_change(self, table, event_type, record, old_record):
+        if self.store.apply_change(table, event_type, record, old_record):
+            self.events_applied += 1
+            self._dirty.set()
+
+    def _on_subscribed(self):
+        # Catch up on anything that changed while we were not subscribed. The sync is a blocking
+        # HTTP round trip, so it runs on the render thread instead of inside the feed's event loop
+        logger.info("Subscribed to change feed.")
+        self._resync.set()
+        self._dirty.set()
+
+    def _feed_loop(self):
+        try:
+            asyncio.run(self.source.run(self._on_change, self._on_subscribed, self._stop))
+        except Exception as e:
+            logger.error(f"Change feed failed: {e}")
+        if self.running and self.fallback:
+            logger.warning("Falling back to polling.")
+            self._stop.set()
+            self._dirty.set()
+            self.fallback.start()
+
+    def _render_loop(self):
+        while True:
+            self._dirty.wait()
+            if self._stop.is_set():
+                return
+            # Coalesce bursts of row events into one regeneration
+            self._stop.wait(self.debounce)
+            if self._stop.is_set():
+                return
+            self._dirty.clear()
+            try:
+                if self._resync.is_set():
+                    self._resync.clear()
+                    self.store.sync()
+                self.update_function(self.store.snapshot())
+            except Exception as e:
+                logger.error(f"Error regenerating topology: {e}")
+
+    def stop(self):
+        self.running = False
+        self._stop.set()
+        self._dirty.set()
+        for thread in (self._feed_thread, self._render_thread):
+            if thread:
+                thread.join(timeout=1)
+        if self.fallback and self.fallback.running:
+            self.fallback.stop()
+        logger.info("Change feed monitoring stopped.")
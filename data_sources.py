@@ -0,0 +1,382 @@
+"""
+Pluggable topology data sources.
+
+Every source serves the nine topology tables as {table_name: rows} and can
+update a single component row, which is all the renderers, the alerting and
+the event generator need. Implementations:
+
+- SupabaseSource:  the hosted Supabase REST API (default)
+- JsonFileSource:  a Topology Generator/HPE.json-style document
+- SQLiteSource:    a local database with the same nine tables and indexes on
+                   the foreign-key columns
+- SyntheticSource: a generated fleet of any size, for load tests
+
+Pick one with the TOPOLOGY_SOURCE (supabase, json, sqlite, synthetic) and
+TOPOLOGY_SOURCE_PATH environment variables, see source_from_env(). A SQLite
+database can be seeded from a JSON document or a synthetic fleet:
+
+    python data_sources.py seed topology.db --json "Topology Generator/HPE.json"
+    python data_sources.py seed topology.db --synthetic 10000
+"""
+import os
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from topology_index import TOPOLOGY_TABLES, CONNECTION_KEYS, build_snapshot
+
+logger = logging.getLogger(__name__)
+
+SOURCE_KIND = os.getenv("TOPOLOGY_SOURCE", "supabase")
+SOURCE_PATH = os.getenv("TOPOLOGY_SOURCE_PATH")
+
+DEFAULT_JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Topology Generator", "HPE.json")
+DEFAULT_SQLITE_PATH = "topology.db"
+
+# component table -> connection table holding its switch links
+SWITCH_CONNECTION_TABLES = {
+    "servers": "server_connected_switches",
+    "storage": "storage_connected_switches",
+    "backup": "backup_connected_switches"
+}
+
+
+class TopologySource:
+    """Base class; subclasses implement fetch_tables and update_row"""
+    name = "base"
+
+    def fetch_tables(self, table_names):
+        """Return {table_name: rows} for the requested tables"""
+        raise NotImplementedError
+
+    def fetch_columns(self, table_name, columns):
+        """Return the rows of one table reduced to the given columns"""
+        rows = self.fetch_tables([table_name])[table_name]
+        return [{col: row.get(col) for col in columns} for row in rows]
+
+    def update_row(self, table_name, row_id, fields):
+        """Update the row with this id; raises on failure"""
+        raise NotImplementedError
+
+    def load(self):
+        """Return a joined snapshot in the fetch_data_from_supabase() structure"""
+        start_time = time.perf_counter()
+        snapshot = build_snapshot(self.fetch_tables(TOPOLOGY_TABLES))
+        logger.info(f"Loaded topology from {self.name} source in {time.perf_counter() - start_time:.3f}s")
+        return snapshot
+
+
+class SupabaseSource(TopologySource):
+    name = "supabase"
+
+    def __init__(self, client, concurrent=True, max_workers=9):
+        self.client = client
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+
+    def _fetch(self, table_name, select="*"):
+        try:
+            resp = self.client.get(table_name, params={"select": select})
+            resp.raise_for_status()
+            return resp.json()
+        except Exception as e:
+            logger.error(f"Error fetching {table_name} from Supabase: {e}")
+            return []
+
+    def fetch_tables(self, table_names):
+        if self.concurrent and len(table_names) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(table_names))) as pool:
+                return dict(zip(table_names, pool.map(self._fetch, table_names)))
+        return {name: self._fetch(name) for name in table_names}
+
+    def fetch_columns(self, table_name, columns):
+        return self._fetch(table_name, ",".join(columns))
+
+    def update_row(self, table_name, row_id, fields):
+        resp = self.client.patch(table_name, json=fields, params={"id": f"eq.{row_id}"})
+        resp.raise_for_status()
+
+
+def _flatten(row):
+    """Copy a document row, lifting metadata (location, ip_address) to top-level columns like the database"""
+    flat = {key: value for key, value in row.items() if key not in ("metadata", "connected_switches", "connected_components")}
+    for key, value in (row.get("metadata") or {}).items():
+        flat.setdefault(key, value)
+    return flat
+
+
+def tables_from_document(document):
+    """Split an HPE.json-style (already joined) document into the nine topology tables"""
+    tables = {name: [] for name in TOPOLOGY_TABLES}
+    private_cloud = document.get("private_cloud")
+    tables["private_cloud"] = [dict(private_cloud)] if private_cloud else []
+    for table_name in ("servers", "network_switches", "storage", "backup"):
+        tables[table_name] = [_flatten(row) for row in document.get(table_name, [])]
+    for table_name, conn_table in SWITCH_CONNECTION_TABLES.items():
+        key = CONNECTION_KEYS[conn_table]
+        tables[conn_table] = [
+            {key: row["id"], "switch_id": conn["switch_id"], "port": conn["port"]}
+            for row in document.get(table_name, [])
+            for conn in row.get("connected_switches", [])
+        ]
+    tables["network_connected_components"] = [
+        {"switch_id": switch["id"], "port": port, "component_id": component_id}
+        for switch in document.get("network_switches", [])
+        for port, component_id in (switch.get("connected_components") or {}).items()
+    ]
+    return tables
+
+
+class JsonFileSource(TopologySource):
+    name = "json"
+
+    def __init__(self, path=DEFAULT_JSON_PATH):
+        self.path = path
+        self._document = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _load_document(self):
+        mtime = os.path.getmtime(self.path)
+        if self._document is None or mtime != self._mtime:
+            with open(self.path, encoding="utf-8") as f:
+                self._document = json.load(f)
+            self._mtime = mtime
+        return self._document
+
+    def fetch_tables(self, table_names):
+        with self._lock:
+            tables = tables_from_document(self._load_document())
+        return {name: tables.get(name, []) for name in table_names}
+
+    def update_row(self, table_name, row_id, fields):
+        with self._lock:
+            document = self._load_document()
+            rows = document.get(table_name)
+            if isinstance(rows, dict):
+                rows = [rows]
+            for row in rows or []:
+                if row.get("id") == row_id:
+                    row.update(fields)
+                    break
+            else:
+                raise KeyError(f"{table_name} row {row_id} not found in {self.path}")
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+
+
+# Columns of each table in the SQLite source
+SQLITE_SCHEMA = {
+    "private_cloud": ["id", "name", "last_sync"],
+    "servers": ["id", "name", "mac", "type", "role", "health", "power_status", "cpu_utilization",
+                "connection_type", "location", "ip_address", "updated_at"],
+    "network_switches": ["id", "name", "mac", "switch_type", "role", "health", "power_status",
+                         "connection_type", "location", "ip_address", "updated_at"],
+    "storage": ["id", "name", "mac", "type", "role", "health", "power_status",
+                "connection_type", "location", "ip_address", "updated_at"],
+    "backup": ["id", "name", "mac", "type", "role", "health", "power_status",
+               "connection_type", "location", "ip_address", "updated_at"],
+    "server_connected_switches": ["server_id", "switch_id", "port"],
+    "storage_connected_switches": ["storage_id", "switch_id", "port"],
+    "backup_connected_switches": ["backup_id", "switch_id", "port"],
+    "network_connected_components": ["switch_id", "port", "component_id"]
+}
+
+# Foreign-key columns that get an index
+SQLITE_INDEXES = {
+    "server_connected_switches": ["server_id", "switch_id"],
+    "storage_connected_switches": ["storage_id", "switch_id"],
+    "backup_connected_switches": ["backup_id", "switch_id"],
+    "network_connected_components": ["switch_id", "component_id"]
+}
+
+
+class SQLiteSource(TopologySource):
+    name = "sqlite"
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self.create_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create_schema(self):
+        with self._connect() as conn:
+            for table_name, columns in SQLITE_SCHEMA.items():
+                column_defs = ", ".join(
+                    f"{col} TEXT PRIMARY KEY" if col == "id" else f"{col} TEXT" for col in columns
+                )
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({column_defs})")
+            for table_name, columns in SQLITE_INDEXES.items():
+                for col in columns:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{col} ON {table_name} ({col})")
+
+    def import_tables(self, tables):
+        """Replace the database contents with {table_name: rows}; unknown columns are dropped"""
+        with self._connect() as conn:
+            for table_name, columns in SQLITE_SCHEMA.items():
+                conn.execute(f"DELETE FROM {table_name}")
+                placeholders = ", ".join("?" for _ in columns)
+                conn.executemany(
+                    f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+                    ([None if row.get(col) is None else str(row.get(col)) for col in columns]
+                     for row in tables.get(table_name, []))
+                )
+
+    def fetch_tables(self, table_names):
+        tables = {}
+        with self._connect() as conn:
+            for table_name in table_names:
+                try:
+                    rows = conn.execute(f"SELECT * FROM {table_name}").fetchall()
+                except sqlite3.Error as e:
+                    logger.error(f"Error reading {table_name} from {self.path}: {e}")
+                    rows = []
+                # Missing values are left out, as they would be absent from a JSON row
+                tables[table_name] = [{key: row[key] for key in row.keys() if row[key] is not None} for row in rows]
+        return tables
+
+    def fetch_columns(self, table_name, columns):
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table_name}").fetchall()
+        return [dict(row) for row in rows]
+
+    def update_row(self, table_name, row_id, fields):
+        columns = [col for col in fields if col in SQLITE_SCHEMA.get(table_name, [])]
+        if not columns:
+            raise KeyError(f"No known columns of {table_name} in {list(fields)}")
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE {table_name} SET {', '.join(f'{col} = ?' for col in columns)} WHERE id = ?",
+                [fields[col] for col in columns] + [str(row_id)]
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(f"{table_name} row {row_id} not found in {self.path}")
+
+
+class SyntheticSource(TopologySource):
+    """A generated leaf/spine style fleet; every component links to one or two switches"""
+    name = "synthetic"
+
+    HEALTH_WEIGHTS = {"healthy": 0.85, "degraded": 0.1, "critical": 0.05}
+
+    def __init__(self, servers=1000, switches=None, storage=None, backup=None, locations=8, seed=0):
+        self.counts = {
+            "servers": servers,
+            "network_switches": switches if switches is not None else max(2, servers // 40),
+            "storage": storage if storage is not None else max(1, servers // 10),
+            "backup": backup if backup is not None else max(1, servers // 50)
+        }
+        self.locations = locations
+        self.seed = seed
+        self._tables = None
+        self._lock = threading.Lock()
+
+    def _generate(self):
+        rng = random.Random(self.seed)
+        healths = list(self.HEALTH_WEIGHTS)
+        weights = list(self.HEALTH_WEIGHTS.values())
+        tables = {name: [] for name in TOPOLOGY_TABLES}
+        tables["private_cloud"] = [{"id": "1", "name": "SYNTHETIC-DC", "last_sync": None}]
+        switch_ids = [f"switch-{i + 1}" for i in range(self.counts["network_switches"])]
+        next_port = {switch_id: 1 for switch_id in switch_ids}
+        specs = {
+            "servers": ("comp", "Compute", "KVM", "compute"),
+            "storage": ("storage", "Storage", "Ceph", "storage"),
+            "backup": ("backup", "Backup", "NAS", "backup")
+        }
+        for i, switch_id in enumerate(switch_ids):
+            tables["network_switches"].append({
+                "id": switch_id, "name": f"Switch-{i + 1}", "mac": f"00:1A:11:BB:{i // 256:02X}:{i % 256:02X}",
+                "switch_type": "8325", "role": "network", "health": rng.choices(healths, weights)[0],
+                "power_status": "on", "location": f"datacenter-{i % self.locations + 1}"
+            })
+        for table_name, (prefix, label, comp_type, role) in specs.items():
+            conn_table = SWITCH_CONNECTION_TABLES[table_name]
+            key = CONNECTION_KEYS[conn_table]
+            for i in range(self.counts[table_name]):
+                comp_id = f"{prefix}-{i + 1}"
+                row = {
+                    "id": comp_id, "name": f"{label}-{i + 1}", "mac": f"00:1A:{i // 65536:02X}:{i // 256 % 256:02X}:{i % 256:02X}:01",
+                    "type": comp_type, "role": role, "health": rng.choices(healths, weights)[0],
+                    "power_status": "on", "connection_type": rng.choice(["FC", "iSCSI"]),
+                    "location": f"datacenter-{i % self.locations + 1}", "ip_address": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+                }
+                if table_name == "servers":
+                    row["cpu_utilization"] = f"{rng.randint(5, 95)}%"
+                tables[table_name].append(row)
+                for switch_id in rng.sample(switch_ids, min(len(switch_ids), rng.choice([1, 2]))):
+                    port = f"1/1/{next_port[switch_id]}"
+                    next_port[switch_id] += 1
+                    tables[conn_table].append({key: comp_id, "switch_id": switch_id, "port": port})
+                    tables["network_connected_components"].append(
+                        {"switch_id": switch_id, "port": port, "component_id": comp_id}
+                    )
+        return tables
+
+    def fetch_tables(self, table_names):
+        with self._lock:
+            if self._tables is None:
+                self._tables = self._generate()
+            return {name: [dict(row) for row in self._tables.get(name, [])] for name in table_names}
+
+    def update_row(self, table_name, row_id, fields):
+        with self._lock:
+            if self._tables is None:
+                self._tables = self._generate()
+            for row in self._tables.get(table_name, []):
+                if row.get("id") == row_id:
+                    row.update(fields)
+                    return
+        raise KeyError(f"{table_name} row {row_id} not found")
+
+
+def make_source(kind, path=None, client=None):
+    """Build a source by name: supabase (needs client), json, sqlite or synthetic"""
+    if kind == "supabase":
+        if client is None:
+            raise ValueError("The supabase source needs a SupabaseClient")
+        return SupabaseSource(client)
+    if kind == "json":
+        return JsonFileSource(path or DEFAULT_JSON_PATH)
+    if kind == "sqlite":
+        return SQLiteSource(path or DEFAULT_SQLITE_PATH)
+    if kind == "synthetic":
+        return SyntheticSource(servers=int(path or os.getenv("TOPOLOGY_SYNTHETIC_SERVERS", 1000)))
+    raise ValueError(f"Unknown topology source: {kind}")
+
+
+def source_from_env(client=None):
+    """Source selected by TOPOLOGY_SOURCE / TOPOLOGY_SOURCE_PATH"""
+    return make_source(SOURCE_KIND, SOURCE_PATH, client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a local SQLite topology database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    seed = subparsers.add_parser("seed", help="Fill a SQLite database from a JSON document or a synthetic fleet")
+    seed.add_argument("database")
+    group = seed.add_mutually_exclusive_group(required=True)
+    group.add_argument("--json", help="HPE.json-style document to import")
+    group.add_argument("--synthetic", type=int, metavar="SERVERS", help="Generate a fleet with this many servers")
+    args = parser.parse_args()
+
+    source = JsonFileSource(args.json) if args.json else SyntheticSource(servers=args.synthetic)
+    tables = source.fetch_tables(TOPOLOGY_TABLES)
+    SQLiteSource(args.database).import_tables(tables)
+    logger.info(f"Seeded {args.database}: " + ", ".join(f"{name}={len(rows)}" for name, rows in tables.items()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
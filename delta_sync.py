@@ -0,0 +1,183 @@
+"""
+Incremental Supabase sync driven by updated_at watermarks.
+
+IncrementalSync keeps an in-memory copy of every topology table. The first
+sync loads each table in full; later syncs only ask PostgREST for rows whose
+updated_at is at or after the table's watermark (updated_at=gte.<watermark>).
+gte rather than gt, because a row committed after a sync can carry the
+watermark's own timestamp; the rows already held at that timestamp come back
+each time and only count as changes if they differ.
+Deleted rows never show up in such a query, so every reconcile_every syncs
+the key columns of each table are fetched and rows that disappeared are
+dropped. Tables without an updated_at column fall back to full reloads.
+
+Change feeds can push single row changes in through apply_change().
+
+snapshot() returns the same dict that fetch_data_from_supabase() builds, so
+generate_png_topology and generate_interactive_topology can consume it as-is.
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from topology_index import join_connections
+
+logger = logging.getLogger(__name__)
+
+# Columns identifying a row in each table, used to merge deltas and detect deletions
+TABLE_KEYS = {
+    "private_cloud": ("id",),
+    "servers": ("id",),
+    "network_switches": ("id",),
+    "storage": ("id",),
+    "backup": ("id",),
+    "server_connected_switches": ("server_id", "switch_id", "port"),
+    "storage_connected_switches": ("storage_id", "switch_id", "port"),
+    "backup_connected_switches": ("backup_id", "switch_id", "port"),
+    "network_connected_components": ("switch_id", "port")
+}
+
+
+class IncrementalSync:
+    def __init__(self, client, tables=None, timestamp_column="updated_at", reconcile_every=10, max_workers=9):
+        self.client = client
+        self.tables = list(tables or TABLE_KEYS)
+        self.timestamp_column = timestamp_column
+        self.reconcile_every = reconcile_every
+        self.max_workers = max_workers
+        self.rows = {table: {} for table in self.tables}
+        self.watermarks = {table: None for table in self.tables}
+        self.full_reload_tables = set()  # tables that have no timestamp column
+        self.sync_count = 0
+        self.last_changes = 0
+        self._lock = threading.RLock()
+
+    def _row_key(self, table, row):
+        return tuple(row.get(col) for col in TABLE_KEYS[table])
+
+    def _advance_watermark(self, table, rows):
+        stamps = [row[self.timestamp_column] for row in rows if row.get(self.timestamp_column)]
+        if stamps:
+            newest = max(stamps)
+            if self.watermarks[table] is None or newest > self.watermarks[table]:
+                self.watermarks[table] = newest
+
+    def _get(self, table, params):
+        resp = self.client.get(table, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _load_full(self, table):
+        rows = self._get(table, {"select": "*"})
+        self.rows[table] = {self._row_key(table, row): row for row in rows}
+        if rows and any(self.timestamp_column not in row for row in rows):
+            self.full_reload_tables.add(table)
+        self._advance_watermark(table, rows)
+        return len(rows)
+
+    def _load_delta(self, table):
+        params = {"select": "*", "order": f"{self.timestamp_column}.asc"}
+        params[self.timestamp_column] = f"gte.{self.watermarks[table]}"
+        rows = self._get(table, params)
+        current = self.rows[table]
+        changes = 0
+        for row in rows:
+            key = self._row_key(table, row)
+            if current.get(key) != row:
+                current[key] = row
+                changes += 1
+        self._advance_watermark(table, rows)
+        return changes
+
+    def _reconcile(self, table):
+        """Drop rows deleted upstream; reload in full if rows appeared that the watermark missed"""
+        key_rows = self._get(table, {"select": ",".join(TABLE_KEYS[table])})
+        live_keys = {self._row_key(table, row) for row in key_rows}
+        current = self.rows[table]
+        deleted = [key for key in current if key not in live_keys]
+        for key in deleted:
+            del current[key]
+        if any(key not in current for key in live_keys):
+            return len(deleted) + self._load_full(table)
+        return len(deleted)
+
+    def _sync_table(self, table, reconcile):
+        try:
+            if self.watermarks[table] is None or table in self.full_reload_tables:
+                return self._load_full(table)
+            changes = self._load_delta(table)
+            if reconcile:
+                changes += self._reconcile(table)
+            return changes
+        except Exception as e:
+            logger.error(f"Error syncing {table} from Supabase: {e}")
+            return 0
+
+    def reload_table(self, table):
+        """Reload one table in full, e.g. when a pushed change cannot be applied row by row"""
+        with self._lock:
+            try:
+                self._load_full(table)
+            except Exception as e:
+                logger.error(f"Error reloading {table} from Supabase: {e}")
+
+    def apply_change(self, table, event_type, record=None, old_record=None):
+        """Apply one pushed INSERT/UPDATE/DELETE row event. Returns True if the snapshot changed"""
+        if table not in self.rows:
+            return False
+        with self._lock:
+            current = self.rows[table]
+            event_type = event_type.upper()
+            if event_type == "DELETE":
+                old_key = self._row_key(table, old_record or {})
+                if None in old_key:
+                    # Without REPLICA IDENTITY FULL only the primary key is sent, so resync the table
+                    self.reload_table(table)
+                    return True
+                return current.pop(old_key, None) is not None
+            if not record:
+                return False
+            key = self._row_key(table, record)
+            if old_record:
+                old_key = self._row_key(table, old_record)
+                if None not in old_key and old_key != key:
+                    current.pop(old_key, None)
+            if current.get(key) == record:
+                return False
+            current[key] = record
+            self._advance_watermark(table, [record])
+            return True
+
+    def sync(self):
+        """Pull changes from Supabase and return the refreshed snapshot"""
+        with self._lock:
+            start_time = time.perf_counter()
+            self.sync_count += 1
+            reconcile = self.reconcile_every and self.sync_count % self.reconcile_every == 0
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.tables))) as pool:
+                changes = list(pool.map(lambda table: self._sync_table(table, reconcile), self.tables))
+            self.last_changes = sum(changes)
+            elapsed = time.perf_counter() - start_time
+            logger.info(
+                f"Incremental sync #{self.sync_count}: {self.last_changes} changed rows in {elapsed:.3f}s"
+                f"{' (reconciled)' if reconcile else ''}"
+            )
+            return self.snapshot()
+
+    def snapshot(self):
+        """Build the fetch_data_from_supabase() structure from the in-memory tables"""
+        with self._lock:
+            tables = {table: [dict(row) for row in self.rows.get(table, {}).values()] for table in TABLE_KEYS}
+        private_cloud = tables["private_cloud"][0] if tables["private_cloud"] else {}
+        join_connections(
+            tables["servers"], tables["storage"], tables["backup"], tables["network_switches"],
+            tables["server_connected_switches"], tables["storage_connected_switches"],
+            tables["backup_connected_switches"], tables["network_connected_components"]
+        )
+        return {
+            "private_cloud": private_cloud,
+            "servers": tables["servers"],
+            "network_switches": tables["network_switches"],
+            "storage": tables["storage"],
+            "backup": tables["backup"]
+        }
@@ -0,0 +1,195 @@
+"""
+Direct DOT renderer for large topologies.
+
+generate_png_topology goes through the diagrams library, which builds a
+Python object per node and edge and always lays out with dot in LR
+direction. emit_dot() writes the same picture (clusters, diagrams icons,
+health-coloured edges labelled "<connection type> (<port>)") straight from
+the snapshot as DOT text, one line at a time, and render_dot() pipes it into
+the chosen Graphviz engine:
+
+- dot:   layered LR layout with orthogonal edges, identical in style to the
+         diagrams output; fine up to a few hundred nodes
+- sfdp:  multiscale force-directed layout for thousands of nodes
+- neato: spring layout for mid-sized fabrics
+
+sfdp and neato do not draw clusters; the cluster subgraphs are still emitted
+so the same DOT can be fed to any engine. Output can be png or svg, or dot
+for the positioned graph that graphviz_cache.GraphvizLayoutCache re-renders
+without running the layout again.
+
+    python dot_emitter.py HPE_topology.png HPE_topology.svg --engine sfdp
+"""
+import os
+import sys
+import logging
+import argparse
+import subprocess
+import tempfile
+from graphviz_cache import edge_token
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("dot", "sfdp", "neato")
+FORMATS = ("png", "svg", "dot")
+
+# Same defaults the diagrams library uses, so both renderers look alike
+GRAPH_ATTRS = {"pad": "2.0", "nodesep": "0.60", "ranksep": "0.75", "fontname": "Sans-Serif",
+               "fontsize": "15", "fontcolor": "#2D3436"}
+ENGINE_ATTRS = {
+    "dot": {"rankdir": "LR", "splines": "ortho"},
+    "sfdp": {"overlap": "prism", "splines": "false", "outputorder": "edgesfirst"},
+    "neato": {"overlap": "false", "splines": "false", "outputorder": "edgesfirst"}
+}
+NODE_ATTRS = {"shape": "none", "fixedsize": "true", "width": "1.4", "height": "1.9", "labelloc": "b",
+              "imagescale": "true", "fontname": "Sans-Serif", "fontsize": "13", "fontcolor": "#2D3436"}
+CLUSTER_ATTRS = {"style": "rounded", "labeljust": "l", "pencolor": "#AEB6BE", "fontname": "Sans-Serif",
+                 "fontsize": "12", "bgcolor": "#E5F5FD"}
+DEFAULT_EDGE_COLOUR = "#7B8894"
+
+# (cluster label, section, required type, diagrams node class) in the order generate_png_topology draws them
+CLUSTERS = (
+    ("Compute Nodes", "servers", "KVM", ("diagrams.onprem.compute", "Server")),
+    ("Storage", "storage", "Ceph", ("diagrams.onprem.storage", "Ceph")),
+    ("Network", "network_switches", None, ("diagrams.generic.network", "Switch")),
+    ("Backup", "backup", "NAS", ("diagrams.onprem.storage", "Ceph"))
+)
+
+HEALTH_COLOURS = {"healthy": "green", "degraded": "orange", "critical": "red", "unknown": "gray"}
+
+
+def _quote(value):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _attrs(attrs):
+    return ", ".join(f"{key}={_quote(value)}" for key, value in attrs.items())
+
+
+def diagrams_icon(module_name, class_name):
+    """Icon file the diagrams library would use for a node class, or None without diagrams"""
+    try:
+        import importlib
+        node_class = getattr(importlib.import_module(module_name), class_name)
+    except ImportError:
+        return None
+    resources_root = os.path.dirname(os.path.dirname(os.path.abspath(sys.modules["diagrams"].__file__)))
+    return os.path.join(resources_root, node_class._icon_dir, node_class._icon)
+
+
+def emit_dot(data, engine="dot", health_colours=HEALTH_COLOURS, edge_labels=True, edge_keys=None):
+    """Yield the DOT source for a snapshot line by line
+
+    With an edge_keys list, every edge is drawn with a placeholder colour (graphviz_cache.edge_token) and its
+    (component id, switch id) key, both as str and sorted, is appended to the list in token order.
+    """
+    cloud = data["private_cloud"].get("name", "Private Cloud") if data["private_cloud"] else "Private Cloud"
+    yield "digraph topology {"
+    yield f"  graph [{_attrs({**GRAPH_ATTRS, **ENGINE_ATTRS[engine], 'label': f'{cloud} Architecture'})}];"
+    yield f"  node [{_attrs(NODE_ATTRS)}];"
+    yield f"  edge [{_attrs({'color': DEFAULT_EDGE_COLOUR})}];"
+
+    drawn = set()
+    for i, (label, section, required_type, icon_class) in enumerate(CLUSTERS):
+        icon = diagrams_icon(*icon_class)
+        yield f"  subgraph cluster_{i} {{"
+        yield f"    graph [{_attrs({**CLUSTER_ATTRS, 'label': label})}];"
+        for comp in data[section]:
+            if required_type is None or comp.get("type") == required_type:
+                drawn.add(comp["id"])
+                attrs = {"label": comp["name"]}
+                if icon:
+                    attrs["image"] = icon
+                yield f"    {_quote(comp['id'])} [{_attrs(attrs)}];"
+        yield "  }"
+
+    processed_connections = set()
+    for section in ("servers", "storage", "backup"):
+        for item in data[section]:
+            colour = health_colours.get(item.get("health", "unknown"), "gray")
+            connection_type = item.get("connection_type", "unknown")
+            for conn in item.get("connected_switches", []):
+                switch_id = conn["switch_id"]
+                connection = tuple(sorted([str(item["id"]), str(switch_id)]))
+                if item["id"] not in drawn or switch_id not in drawn or connection in processed_connections:
+                    continue
+                processed_connections.add(connection)
+                if edge_keys is not None:
+                    colour = edge_token(len(edge_keys))
+                    edge_keys.append(connection)
+                attrs = {"color": colour}
+                if edge_labels:
+                    attrs["label"] = f"{connection_type} ({conn['port']})"
+                yield f"  {_quote(item['id'])} -> {_quote(switch_id)} [{_attrs(attrs)}];"
+    yield "}"
+
+
+def write_dot(data, path, **kwargs):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in emit_dot(data, **kwargs):
+            f.write(line + "\n")
+
+
+def render_dot(data, output_paths, engine="dot", timeout=300, **kwargs):
+    """Pipe emit_dot() into a Graphviz engine and atomically write every output path; True on success
+
+    The format of each output comes from its extension; all formats share one layout run.
+    """
+    if isinstance(output_paths, str):
+        output_paths = [output_paths]
+    command = [engine]
+    for output_path in output_paths:
+        fmt = os.path.splitext(output_path)[1].lstrip(".")
+        if engine not in ENGINES or fmt not in FORMATS:
+            logger.error(f"Unsupported engine/format {engine}/{fmt}; expected one of {ENGINES} / {FORMATS}")
+            return False
+        command += [f"-T{fmt}", "-o", f"{output_path}.tmp"]
+    # stderr goes to a file so a chatty engine cannot block while we are still writing stdin
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr)
+        except OSError as e:
+            logger.error(f"Could not start Graphviz {engine}: {e}")
+            return False
+        try:
+            for line in emit_dot(data, engine=engine, **kwargs):
+                process.stdin.write(line.encode("utf-8") + b"\n")
+            process.stdin.close()
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            logger.error(f"Graphviz {engine} did not finish within {timeout}s")
+            return False
+        except BrokenPipeError:
+            returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            logger.error(f"Graphviz {engine} failed: {stderr.read().decode(errors='replace').strip()}")
+            return False
+    for output_path in output_paths:
+        os.replace(f"{output_path}.tmp", output_path)
+    return True
+
+
+def main():
+    from combined_topology import fetch_data_from_supabase
+
+    parser = argparse.ArgumentParser(description="Render the topology with a Graphviz engine, bypassing diagrams")
+    parser.add_argument("outputs", nargs="+", help="output files (.png / .svg), or one .dot to only write the DOT source")
+    parser.add_argument("--engine", choices=ENGINES, default="sfdp")
+    parser.add_argument("--no-edge-labels", action="store_true", help="drop port labels (much faster for big graphs)")
+    args = parser.parse_args()
+
+    data = fetch_data_from_supabase()
+    if not data:
+        sys.exit(1)
+    if args.outputs[0].endswith(".dot"):
+        write_dot(data, args.outputs[0], engine=args.engine, edge_labels=not args.no_edge_labels)
+    elif not render_dot(data, args.outputs, engine=args.engine, edge_labels=not args.no_edge_labels):
+        sys.exit(1)
+    logger.info(f"Wrote {', '.join(args.outputs)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -2,8 +2,9 @@ import time
 import random
 import threading
 import logging
-import requests
 from typing import Dict
+from supabase_client import get_client
+from data_sources import source_from_env
 
 # Configure logging
 logging.basicConfig(
@@ -22,17 +23,14 @@ HEALTH_STATUSES = ["healthy", "degraded", "critical"]
 EVENT_TYPES = ["status_change", "power_cycle", "network_issue", "storage_alert"]
 
 class EventGenerator:
-    def __init__(self):
-        self.headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
-            "Content-Type": "application/json"
-        }
+    def __init__(self, source=None):
+        # Supabase by default; TOPOLOGY_SOURCE selects an offline source instead
+        self.source = source or source_from_env(get_client(SUPABASE_URL, SUPABASE_KEY))
         logger.info("Successfully initialized event generator")
         self.component_ids = self.fetch_all_component_ids()
 
     def fetch_all_component_ids(self) -> Dict[str, list]:
-        """Fetch all real component IDs from Supabase tables"""
+        """Fetch all real component IDs from the topology tables"""
         table_map = {
             "KVM": "servers",
             "Ceph": "storage",
@@ -42,10 +40,7 @@ class EventGenerator:
         ids = {key: [] for key in table_map}
         for comp_type, table in table_map.items():
             try:
-                url = f"{SUPABASE_URL}/rest/v1/{table}"
-                resp = requests.get(url, headers=self.headers, params={"select": "id"})
-                resp.raise_for_status()
-                data = resp.json()
+                data = self.source.fetch_columns(table, ["id"])
                 ids[comp_type] = [row["id"] for row in data if "id" in row]
             except Exception as e:
                 logger.error(f"Error fetching IDs from {table}: {e}")
@@ -84,18 +79,12 @@ class EventGenerator:
             # Map component type to table name
             table_name = self._get_table_name(event["component_type"])
             if table_name:
-                url = f"{SUPABASE_URL}/rest/v1/{table_name}"
                 # Only update the health field, do not send any other data
                 update_data = {
                     "health": event["health_status"]
                 }
                 component_id = event["component_id"]
-                response = requests.patch(
-                    f"{url}?id=eq.{component_id}",
-                    headers=self.headers,
-                    json=update_data
-                )
-                response.raise_for_status()
+                self.source.update_row(table_name, component_id, update_data)
                 logger.info(f"Updated {event['component_type']} {component_id} status to {event['health_status']}")
         except Exception as e:
             logger.error(f"Error updating Supabase: {str(e)}")
@@ -0,0 +1,89 @@
+"""
+Graphviz layout cache for the PNG topology.
+
+Running dot is the slow part of the PNG output, and most refreshes only
+change health colours. The PNG is therefore produced in two steps:
+
+1. On a structural change the diagram is laid out once with `dot -Tdot`,
+   which writes the graph back out with every node, cluster and edge spline
+   positioned. Each edge is drawn with a unique placeholder colour
+   (edge_token), so its colour can be found again in the positioned DOT.
+2. Every refresh substitutes the current health colours for the
+   placeholders and rasterizes with `neato -n2`, which takes the stored
+   positions as-is and skips the layout algorithm.
+
+The cache is keyed by the structure digest from snapshot_digest, so health
+and power flips reuse the layout and anything that moves nodes or edges
+triggers a new one. The positioned DOT can come from the diagrams library
+(outformat="dot") or from dot_emitter with any of its engines.
+"""
+import os
+import re
+import logging
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Placeholder colours are #rrggbb01, counting up from 1; the low alpha keeps them out of real styling
+_TOKEN_PATTERN = re.compile(r'"#([0-9a-f]{6})01"')
+
+
+def edge_token(index):
+    return f"#{index + 1:06x}01"
+
+
+class GraphvizLayoutCache:
+    def __init__(self, output_path, dpi="150", timeout=60):
+        """dpi=None keeps the resolution stored in the layout"""
+        self.output_path = output_path
+        self.dpi = dpi
+        self.timeout = timeout
+        self.structure = None
+        self.positioned_dot = None
+        self.edge_keys = []  # edge key per token index
+
+    def matches(self, structure):
+        return self.positioned_dot is not None and structure == self.structure
+
+    def store(self, structure, positioned_dot_path, edge_keys):
+        """Keep the positioned DOT written by a Diagram rendered with outformat="dot" """
+        with open(positioned_dot_path, "r", encoding="utf-8") as f:
+            self.positioned_dot = f.read()
+        os.remove(positioned_dot_path)
+        self.structure = structure
+        self.edge_keys = list(edge_keys)
+
+    def invalidate(self):
+        self.structure = None
+        self.positioned_dot = None
+        self.edge_keys = []
+
+    def recolor(self, colours, default="gray"):
+        """Positioned DOT with each placeholder replaced by colours[edge key]"""
+        def _colour(match):
+            index = int(match.group(1), 16) - 1
+            key = self.edge_keys[index] if index < len(self.edge_keys) else None
+            return f'"{colours.get(key, default)}"'
+        return _TOKEN_PATTERN.sub(_colour, self.positioned_dot)
+
+    def rasterize(self, colours, output_paths=None):
+        """Write the cached layout with the given edge colours to output_path (or output_paths, format by
+        extension, all from one neato run); False on failure"""
+        output_paths = output_paths or [self.output_path]
+        command = ["neato", "-n2"] + ([f"-Gdpi={self.dpi}"] if self.dpi else [])
+        for output_path in output_paths:
+            command += [f"-T{os.path.splitext(output_path)[1].lstrip('.')}", "-o", f"{output_path}.tmp"]
+        try:
+            subprocess.run(
+                command,
+                input=self.recolor(colours).encode("utf-8"),
+                check=True, capture_output=True, timeout=self.timeout
+            )
+            for output_path in output_paths:
+                os.replace(f"{output_path}.tmp", output_path)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"neato failed to rasterize cached layout: {e.stderr.decode(errors='replace').strip()}")
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"Failed to rasterize cached layout: {e}")
+        return False
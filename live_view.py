@@ -0,0 +1,297 @@
+"""
+Live topology page served over local HTTP.
+
+Instead of rewriting HPE_topology.html with a meta refresh, LiveTopologyServer
+serves the page once and keeps the browser up to date by long polling:
+
+- GET /                      the page (Plotly from the CDN plus a small client)
+- GET /figure                {"version": n, "figure": {...}} full figure
+- GET /updates?since=n       waits for a version newer than n and answers with
+                             {"version": m, "patches": [...]} or, when the
+                             patches are no longer kept or the figure changed
+                             shape, {"version": m, "figure": {...}}
+- GET /group?id=<group id>   full-detail figure of one level-of-detail
+                             supernode, built on demand by detail_provider
+- GET /topology_assets/<f>   shared node icons written by publish_image_asset
+
+A patch is [trace index, dotted attribute path, point index or null, value].
+The page applies patches to its copy of the figure and calls Plotly.react,
+so one health change costs a few patches instead of a full page reload, and
+zoom/pan survive because the figure carries a fixed uirevision. Clicking a
+supernode swaps in its detail figure until "Back to overview" is pressed.
+"""
+import os
+import json
+import logging
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# How long /updates holds a request open before answering with no patches
+LONG_POLL_TIMEOUT = 25
+# Patch sets kept for clients that fell behind; older clients get the full figure
+HISTORY_SIZE = 64
+
+
+def _diff_value(trace, path, old, new, patches):
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict) and old.keys() == new.keys():
+        for key in new:
+            _diff_value(trace, f"{path}.{key}" if path else key, old[key], new[key], patches)
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for i, (a, b) in enumerate(zip(old, new)):
+            if a != b:
+                patches.append([trace, path, i, b])
+    else:
+        patches.append([trace, path, None, new])
+
+
+def diff_figures(old, new):
+    """Point-level patches turning figure dict old into new, or None when only a full figure will do"""
+    if old is None or old.get("layout") != new.get("layout") or len(old["data"]) != len(new["data"]):
+        return None
+    patches = []
+    for trace, (a, b) in enumerate(zip(old["data"], new["data"])):
+        if a.keys() != b.keys():
+            # A patch needs an attribute path; a trace gaining or losing attributes is sent whole
+            return None
+        _diff_value(trace, "", a, b, patches)
+    return patches
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <script src="{plotly_src}"></script>
+</head>
+<body>
+<button id="back" style="display: none" onclick="backToOverview()">Back to overview</button>
+<div id="topology"></div>
+<script>
+const gd = document.getElementById("topology");
+const back = document.getElementById("back");
+const retryMs = {retry_ms};
+let version = 0;
+let drilledGroup = null;
+
+async function showGroup(groupId) {{
+    const response = await fetch(`group?id=${{encodeURIComponent(groupId)}}`);
+    if (!response.ok) {{
+        // The group is gone (e.g. regrouped); fall back to the overview
+        return drilledGroup ? backToOverview() : undefined;
+    }}
+    const message = await response.json();
+    drilledGroup = groupId;
+    back.style.display = "";
+    await Plotly.react(gd, message.figure.data, message.figure.layout);
+}}
+
+async function backToOverview() {{
+    drilledGroup = null;
+    back.style.display = "none";
+    const response = await fetch("figure");
+    await render(await response.json());
+}}
+
+function bindClicks() {{
+    gd.on("plotly_click", event => {{
+        const groupId = event.points[0].customdata;
+        if (!drilledGroup && typeof groupId === "string" && groupId.startsWith("group:")) {{
+            showGroup(groupId);
+        }}
+    }});
+}}
+
+function applyPatch([trace, path, index, value]) {{
+    const keys = path.split(".");
+    let target = gd.data[trace];
+    for (const key of keys.slice(0, -1)) {{
+        target = target[key] = target[key] || {{}};
+    }}
+    const last = keys[keys.length - 1];
+    if (index === null) {{
+        target[last] = value;
+    }} else {{
+        target[last][index] = value;
+    }}
+}}
+
+async function render(message) {{
+    if (drilledGroup) {{
+        // The overview is fetched again on the way back; keep the detail view current meanwhile
+        version = message.version;
+        return showGroup(drilledGroup);
+    }}
+    if (message.figure) {{
+        await Plotly.react(gd, message.figure.data, message.figure.layout);
+    }} else if (message.patches.length) {{
+        message.patches.forEach(applyPatch);
+        // datarevision tells Plotly.react the data was changed in place
+        gd.layout.datarevision = message.version;
+        await Plotly.react(gd, gd.data, gd.layout);
+    }}
+    version = message.version;
+}}
+
+async function poll() {{
+    while (true) {{
+        try {{
+            const response = await fetch(`updates?since=${{version}}`);
+            await render(await response.json());
+        }} catch (e) {{
+            await new Promise(resolve => setTimeout(resolve, retryMs));
+        }}
+    }}
+}}
+
+fetch("figure").then(response => response.json()).then(render).then(bindClicks).then(poll);
+</script>
+</body>
+</html>
+"""
+
+
+class LiveTopologyServer:
+    def __init__(self, host="127.0.0.1", port=8050, static_root=".", assets_dir="topology_assets", retry_interval=3,
+                 detail_provider=None):
+        self.host = host
+        self.port = port
+        self.static_root = static_root
+        self.assets_dir = assets_dir
+        self.retry_interval = retry_interval
+        self.detail_provider = detail_provider  # group id -> figure dict or None
+        self.title = "Topology"
+        self.version = 0
+        self.figure = None
+        self.history = deque(maxlen=HISTORY_SIZE)  # (version, patches or None)
+        self._changed = threading.Condition()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def publish(self, figure, title=None):
+        """Make figure (a plotly JSON dict) the current view and wake waiting clients"""
+        with self._changed:
+            patches = diff_figures(self.figure, figure)
+            if patches == []:
+                return self.version
+            self.version += 1
+            self.figure = figure
+            self.title = title or self.title
+            self.history.append((self.version, patches))
+            self._changed.notify_all()
+        logger.info(
+            f"Live view v{self.version}: "
+            f"{'full figure' if patches is None else f'{len(patches)} patches'}"
+        )
+        return self.version
+
+    def updates_since(self, since, timeout=LONG_POLL_TIMEOUT):
+        """Message for a client at version since, waiting up to timeout for something newer"""
+        with self._changed:
+            if since > self.version:
+                # Client is ahead of us, e.g. after a restart
+                return {"version": self.version, "figure": self.figure}
+            self._changed.wait_for(lambda: self.version > since, timeout=timeout)
+            if self.version <= since:
+                return {"version": self.version, "patches": []}
+            patches = []
+            for version, version_patches in self.history:
+                if version <= since:
+                    continue
+                if version_patches is None or version != since + 1:
+                    return {"version": self.version, "figure": self.figure}
+                patches.extend(version_patches)
+                since = version
+            if since != self.version:
+                return {"version": self.version, "figure": self.figure}
+            return {"version": self.version, "patches": patches}
+
+    def page(self):
+        import plotly.offline
+        return PAGE_TEMPLATE.format(
+            title=self.title,
+            plotly_src=f"https://cdn.plot.ly/plotly-{plotly.offline.get_plotlyjs_version()}.min.js",
+            retry_ms=int(self.retry_interval * 1000)
+        )
+
+    def _handler(self):
+        live = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, message):
+                self._send(200, json.dumps(message).encode("utf-8"), "application/json")
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                try:
+                    if url.path == "/":
+                        self._send(200, live.page().encode("utf-8"), "text/html; charset=utf-8")
+                    elif url.path == "/figure":
+                        # Figures are replaced, never modified, so only the read needs the lock;
+                        # serialising and sending outside it keeps a slow client from blocking publish()
+                        with live._changed:
+                            message = {"version": live.version, "figure": live.figure}
+                        self._send_json(message)
+                    elif url.path == "/updates":
+                        since = int(parse_qs(url.query).get("since", ["0"])[0])
+                        self._send_json(live.updates_since(since))
+                    elif url.path == "/group" and live.detail_provider:
+                        group_id = parse_qs(url.query).get("id", [""])[0]
+                        figure = live.detail_provider(group_id)
+                        if figure is None:
+                            self._send(404, b"Unknown group", "text/plain")
+                            return
+                        self._send_json({"version": live.version, "figure": figure})
+                    elif url.path.startswith(f"/{live.assets_dir}/"):
+                        name = os.path.basename(url.path)
+                        path = os.path.join(live.static_root, live.assets_dir, name)
+                        if not os.path.isfile(path):
+                            self._send(404, b"Not found", "text/plain")
+                            return
+                        with open(path, "rb") as f:
+                            self._send(200, f.read(), "image/png")
+                    else:
+                        self._send(404, b"Not found", "text/plain")
+                except ValueError:
+                    self._send(400, b"Bad request", "text/plain")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                logger.debug(f"Live view {self.address_string()} {format % args}")
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Live topology view serving at {self.url}")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=1)
+        logger.info("Live topology view stopped.")
@@ -0,0 +1,78 @@
+"""
+Concurrent renderers with per-renderer timeouts.
+
+RendererPool gives every renderer (PNG, HTML, ...) its own single-worker
+executor. Running in separate processes keeps the CPU-bound renderers from
+contending for the GIL, and pinning each renderer to one long-lived worker
+keeps its in-process caches (Graphviz layout, position cache) warm between
+refreshes. Arguments are pickled into the worker, so every renderer works
+on its own copy of the snapshot.
+
+A renderer that overruns its timeout is abandoned: its executor is shut
+down and a fresh one is started on the next submit. The abandoned worker
+exits once its task ends (Graphviz runs have their own timeouts). The
+caller gets None for that renderer and the other outputs are unaffected.
+"""
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+class RendererPool:
+    def __init__(self, timeouts, use_processes=True):
+        self.timeouts = dict(timeouts)
+        self.use_processes = use_processes
+        self._executors = {}
+
+    def _executor(self, name):
+        executor = self._executors.get(name)
+        if executor is None:
+            if self.use_processes:
+                # spawn: workers never inherit the monitor's threads, sockets or locks
+                executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"render-{name}")
+            self._executors[name] = executor
+        return executor
+
+    def _reset(self, name):
+        executor = self._executors.pop(name, None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, jobs):
+        """Run {name: (function, args)} concurrently; returns {name: result, or None on failure/timeout}"""
+        start = time.perf_counter()
+        futures = {}
+        for name, (function, args) in jobs.items():
+            try:
+                futures[name] = self._executor(name).submit(function, *args)
+            except (BrokenProcessPool, RuntimeError) as e:
+                logger.error(f"Could not start {name} renderer: {e}")
+                self._reset(name)
+
+        results = {name: None for name in jobs}
+        for name, future in futures.items():
+            timeout = self.timeouts.get(name)
+            remaining = None if timeout is None else max(0, start + timeout - time.perf_counter())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except TimeoutError:
+                logger.error(f"{name} renderer exceeded its {timeout}s timeout; restarting its worker")
+                self._reset(name)
+            except BrokenProcessPool as e:
+                logger.error(f"{name} renderer worker died: {e}")
+                self._reset(name)
+            except Exception as e:
+                logger.error(f"{name} renderer failed: {e}")
+        logger.debug(f"Renderers {', '.join(jobs)} finished in {time.perf_counter() - start:.3f}s")
+        return results
+
+    def shutdown(self):
+        for name in list(self._executors):
+            executor = self._executors.pop(name)
+            executor.shutdown(wait=False, cancel_futures=True)
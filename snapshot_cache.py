@@ -0,0 +1,174 @@
+"""
+Background-refreshed topology snapshot for the web backend.
+
+Without it every GET of /api/topology_data runs a full fetch (nine
+Supabase requests plus a PATCH), so N screens polling every few seconds
+multiply the upstream load for identical data. SnapshotCache runs one
+worker thread that calls the loader at a fixed cadence and keeps the last
+good snapshot in memory together with its serialized JSON body. Requests
+only read that reference and never wait for Supabase:
+
+- stale-while-revalidate: a slow or failing refresh leaves the previous
+  snapshot in place and requests keep getting it; age() tells how old it
+  is so the endpoint can report it
+- cold start: the first request waits (up to cold_start_timeout) for the
+  first load, later ones never block
+- the worker is started lazily by the first get(), so the Flask reloader
+  parent process, which serves no requests, never polls Supabase
+
+Every snapshot carries a version that only advances when the content digest
+(snapshot_digest, which ignores last_sync and updated_at) changes, so
+clients can poll the version and download the topology only when it moves.
+Versions start from the wall clock in milliseconds, so they keep increasing
+across backend restarts.
+
+The last history_size versions are kept in a ring, so delta_since() can
+answer with only the components that changed since a client's version
+(topology_delta), falling back to the full snapshot when that version has
+left the ring. on_change(previous, snapshot) is called from the worker for
+every new version (previous is None for the first one), e.g. to push the
+change to streaming clients.
+"""
+import json
+import time
+import logging
+import datetime
+import threading
+from collections import deque
+from snapshot_digest import compute_digests
+from topology_delta import diff_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    __slots__ = ("data", "body", "fetched_at", "version", "digest", "changed_at")
+
+    def __init__(self, data, body, fetched_at, version, digest, changed_at):
+        self.data = data
+        self.body = body
+        self.fetched_at = fetched_at
+        self.version = version
+        self.digest = digest
+        self.changed_at = changed_at
+
+    def changed_at_iso(self):
+        return datetime.datetime.fromtimestamp(self.changed_at, datetime.timezone.utc).isoformat(timespec="milliseconds")
+
+
+class SnapshotCache:
+    def __init__(self, loader, refresh_interval=5, stale_after=30, cold_start_timeout=30, serialize=json.dumps,
+                 history_size=16, on_change=None):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.stale_after = stale_after
+        self.cold_start_timeout = cold_start_timeout
+        self.serialize = serialize
+        self.on_change = on_change
+        self.snapshot = None  # replaced wholesale, so readers need no lock
+        self.history = deque(maxlen=history_size)  # recent versions, oldest first
+        self._history_lock = threading.Lock()  # request threads read the ring while the worker appends
+        self._deltas = {}  # (since, version) -> serialized delta, reset on every new version
+        self.refreshes = 0
+        self.failures = 0
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-refresh", daemon=True)
+                self._thread.start()
+                logger.info(f"Snapshot cache refreshing every {self.refresh_interval}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 5)
+
+    def refresh(self):
+        """Load and publish a new snapshot; the previous one is kept on failure"""
+        start = time.perf_counter()
+        try:
+            data = self.loader()
+        except Exception as e:
+            logger.error(f"Snapshot refresh failed: {e}")
+            data = None
+        if not data:
+            self.failures += 1
+            if self.snapshot:
+                logger.warning(f"Snapshot refresh failed; still serving data from {self.age():.0f}s ago")
+            return False
+        now = time.time()
+        digest = compute_digests(data)["content"]
+        previous = self.snapshot
+        if previous and digest == previous.digest:
+            # Same content: keep the body and version, only the age resets
+            self.snapshot = Snapshot(previous.data, previous.body, now, previous.version, digest, previous.changed_at)
+        else:
+            version = previous.version + 1 if previous else int(now * 1000)
+            self.snapshot = Snapshot(data, self.serialize(data).encode("utf-8"), now, version, digest, now)
+            with self._history_lock:
+                self.history.append(self.snapshot)
+            self._deltas = {}
+            logger.info(f"Topology snapshot advanced to version {version}")
+            if self.on_change:
+                try:
+                    self.on_change(previous, self.snapshot)
+                except Exception as e:
+                    logger.error(f"Snapshot change listener failed: {e}")
+        self.refreshes += 1
+        self._ready.set()
+        logger.debug(f"Snapshot refreshed in {time.perf_counter() - start:.3f}s")
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.refresh()
+            # Keep the cadence; a refresh slower than the interval is followed by the next one at once
+            self._stop.wait(max(0, self.refresh_interval - (time.monotonic() - started)))
+
+    def get(self):
+        """Current Snapshot, or None if the first load has not succeeded within cold_start_timeout"""
+        if self.snapshot is None:
+            self.start()
+            self._ready.wait(self.cold_start_timeout)
+        return self.snapshot
+
+    def delta_since(self, since, snapshot):
+        """Serialized delta from version since to snapshot, or the full snapshot if since is not in the ring"""
+        key = (since, snapshot.version)
+        body = self._deltas.get(key)
+        if body is not None:
+            return body
+        with self._history_lock:
+            base = next((old for old in self.history if old.version == since), None)
+        if base is None:
+            return b'{"full":true,"version":%d,"data":%s}\n' % (snapshot.version, snapshot.body.rstrip(b"\n"))
+        delta = {"full": False, "since": since, "version": snapshot.version, **diff_snapshots(base.data, snapshot.data)}
+        body = self.serialize(delta).encode("utf-8")
+        if snapshot is self.snapshot:
+            self._deltas[key] = body
+        return body
+
+    def age(self):
+        return time.time() - self.snapshot.fetched_at if self.snapshot else None
+
+    def is_stale(self):
+        return self.snapshot is not None and self.age() > self.stale_after
+
+    def stats(self):
+        with self._history_lock:
+            history = [old.version for old in self.history]
+        return {
+            "version": self.snapshot.version if self.snapshot else None,
+            "history": history,
+            "refresh_interval": self.refresh_interval,
+            "age": self.age(),
+            "stale": self.is_stale(),
+            "refreshes": self.refreshes,
+            "failures": self.failures
+        }
@@ -0,0 +1,95 @@
+"""
+Stable content digests for topology snapshots.
+
+A snapshot (the dict returned by fetch_data_from_supabase) is normalized
+before hashing: components are ordered by id, connections are sorted and
+bookkeeping fields that change without the topology changing (last_sync,
+updated_at) are ignored. Three digests are produced:
+
+- content:   everything the renderers show
+- structure: nodes and edges (ids, names, types, ports, connection types)
+- state:     per-component health and power status
+"""
+import json
+import hashlib
+
+COMPONENT_SECTIONS = ("servers", "network_switches", "storage", "backup")
+
+# Fields that move on every sync without changing what is drawn
+VOLATILE_FIELDS = {"last_sync", "updated_at"}
+
+STATE_FIELDS = ("health", "power_status")
+
+
+def _hash(obj):
+    encoded = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _sort_key(value):
+    return str(value)
+
+
+def _normalize_component(comp):
+    normalized = {key: value for key, value in comp.items() if key not in VOLATILE_FIELDS}
+    if "connected_switches" in normalized:
+        normalized["connected_switches"] = sorted(
+            ({"switch_id": conn.get("switch_id"), "port": conn.get("port")} for conn in normalized["connected_switches"]),
+            key=lambda conn: (_sort_key(conn["switch_id"]), _sort_key(conn["port"]))
+        )
+    if "connected_components" in normalized:
+        normalized["connected_components"] = sorted(
+            [_sort_key(port), component_id] for port, component_id in normalized["connected_components"].items()
+        )
+    return normalized
+
+
+def normalize_snapshot(data):
+    """Order-independent copy of a snapshot with volatile fields removed"""
+    normalized = {
+        "private_cloud": {
+            key: value for key, value in (data.get("private_cloud") or {}).items() if key not in VOLATILE_FIELDS
+        }
+    }
+    for section in COMPONENT_SECTIONS:
+        normalized[section] = sorted(
+            (_normalize_component(comp) for comp in data.get(section, [])),
+            key=lambda comp: _sort_key(comp.get("id"))
+        )
+    return normalized
+
+
+def structure_view(normalized):
+    """Nodes and edges only"""
+    view = {"cloud": normalized["private_cloud"].get("name")}
+    for section in COMPONENT_SECTIONS:
+        view[section] = [
+            {
+                "id": comp.get("id"),
+                "name": comp.get("name"),
+                "type": comp.get("type", comp.get("switch_type")),
+                "connection_type": comp.get("connection_type"),
+                "connected_switches": comp.get("connected_switches"),
+                "connected_components": comp.get("connected_components")
+            }
+            for comp in normalized[section]
+        ]
+    return view
+
+
+def state_view(normalized):
+    """Health and power status keyed by component"""
+    return {
+        section: [[comp.get("id")] + [comp.get(field) for field in STATE_FIELDS] for comp in normalized[section]]
+        for section in COMPONENT_SECTIONS
+    }
+
+
+def compute_digests(data):
+    """Return {"content", "structure", "state"} SHA-256 hex digests for a snapshot"""
+    normalized = normalize_snapshot(data)
+    return {
+        "content": _hash(normalized),
+        "structure": _hash(structure_view(normalized)),
+        "state": _hash(state_view(normalized))
+    }
@@ -0,0 +1,81 @@
+"""
+Pooled keep-alive HTTP client for the Supabase REST API.
+
+Every caller in a process shares one client (see get_client), so repeated
+reads and writes reuse the same TCP/TLS connections instead of performing a
+fresh handshake per request. Auth headers are built once per client.
+"""
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", 10))
+DEFAULT_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 10))
+
+
+class SupabaseClient:
+    def __init__(self, url, key, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.base_url = f"{url.rstrip('/')}/rest/v1"
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers.update({
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json"
+        })
+        # pool_maxsize must cover the concurrent fetch workers, otherwise surplus connections are discarded
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._adapter = adapter
+
+    def request(self, method, table_name, params=None, json=None, headers=None, timeout=None):
+        """Send a request to /rest/v1/<table_name>. Callers handle raise_for_status()"""
+        return self.session.request(
+            method,
+            f"{self.base_url}/{table_name}",
+            params=params,
+            json=json,
+            headers=headers,
+            timeout=self.timeout if timeout is None else timeout
+        )
+
+    def get(self, table_name, params=None, **kwargs):
+        return self.request("GET", table_name, params=params, **kwargs)
+
+    def patch(self, table_name, json=None, params=None, **kwargs):
+        return self.request("PATCH", table_name, params=params, json=json, **kwargs)
+
+    def pool_stats(self):
+        """Connection pool counters summed over every host this client has talked to"""
+        stats = {"pool_size": self.pool_size, "requests": 0, "connections_opened": 0, "open_connections": 0}
+        pools = self._adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is None or pool.pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["connections_opened"] += pool.num_connections
+            # Idle keep-alive connections wait in the pool queue; unused slots are None
+            stats["open_connections"] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        stats["reused"] = max(stats["requests"] - stats["connections_opened"], 0)
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url, key, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """Return the process-wide client for this project, creating it on first use"""
+    with _clients_lock:
+        client = _clients.get((url, key))
+        if client is None:
+            client = SupabaseClient(url, key, pool_size=pool_size, timeout=timeout)
+            _clients[(url, key)] = client
+        return client
@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase_client import SupabaseClient
+from topology_index import CONNECTION_KEYS, TOPOLOGY_TABLES, build_snapshot
+
+EMBED = re.compile(r"^(\w+)\(([\w,]+)\)$")
+
+
+class PostgrestStub:
+    """Local stand-in for the PostgREST endpoints the loaders use.
+
+    Serves GET /rest/v1/<table> from self.tables with select=* or a column list,
+    one embedded resource (select=*,<connection table>(<columns>)), eq/gt/gte filters
+    and order=<column>.asc. With embedding off, embedded selects get PostgREST's 400.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.embedding = True
+        self.requests = []  # (table, query params) of every request
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                table = url.path.rsplit("/", 1)[-1]
+                params = {name: values[0] for name, values in parse_qs(url.query).items()}
+                stub.requests.append((table, params))
+                status, body = stub.respond(table, params)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def respond(self, table, params):
+        if table not in self.tables:
+            return 404, {"code": "42P01", "message": f'relation "public.{table}" does not exist'}
+        rows = [dict(row) for row in self.tables[table]]
+        for column, condition in params.items():
+            if column in ("select", "order"):
+                continue
+            op, value = condition.split(".", 1)
+            compare = {"eq": str.__eq__, "gt": str.__gt__, "gte": str.__ge__}[op]
+            rows = [row for row in rows if row.get(column) is not None and compare(str(row[column]), value)]
+        if "order" in params:
+            column = params["order"].split(".")[0]
+            rows.sort(key=lambda row: row.get(column) or "")
+        select = params.get("select", "*").split(",", 1)
+        if select[0] != "*":
+            columns = params["select"].split(",")
+            return 200, [{col: row.get(col) for col in columns} for row in rows]
+        if len(select) == 2:
+            match = EMBED.match(select[1])
+            if not self.embedding or not match:
+                return 400, {"code": "PGRST200", "message": "Could not find a relationship in the schema cache"}
+            conn_table, columns = match.group(1), match.group(2).split(",")
+            key = CONNECTION_KEYS[conn_table]
+            for row in rows:
+                row[conn_table] = [
+                    {col: conn.get(col) for col in columns}
+                    for conn in self.tables[conn_table] if conn[key] == row["id"]
+                ]
+        return 200, rows
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def topology_tables():
+    """Small topology in table form; srv-3 has no connections"""
+    stamp = "2025-01-01T00:00:00+00:00"
+    return {
+        "private_cloud": [{"id": 1, "name": "HPE Private Cloud", "last_sync": stamp, "updated_at": stamp}],
+        "servers": [
+            {"id": "srv-1", "name": "Server 1", "health": "Healthy", "updated_at": stamp},
+            {"id": "srv-2", "name": "Server 2", "health": "Critical", "updated_at": stamp},
+            {"id": "srv-3", "name": "Server 3", "health": "Healthy", "updated_at": stamp}
+        ],
+        "network_switches": [
+            {"id": "sw-1", "name": "Switch 1", "health": "Healthy", "updated_at": stamp},
+            {"id": "sw-2", "name": "Switch 2", "health": "Healthy", "updated_at": stamp}
+        ],
+        "storage": [{"id": "st-1", "name": "Storage 1", "health": "Healthy", "updated_at": stamp}],
+        "backup": [{"id": "bk-1", "name": "Backup 1", "health": "Warning", "updated_at": stamp}],
+        "server_connected_switches": [
+            {"server_id": "srv-1", "switch_id": "sw-1", "port": "1", "updated_at": stamp},
+            {"server_id": "srv-1", "switch_id": "sw-2", "port": "1", "updated_at": stamp},
+            {"server_id": "srv-2", "switch_id": "sw-1", "port": "2", "updated_at": stamp}
+        ],
+        "storage_connected_switches": [
+            {"storage_id": "st-1", "switch_id": "sw-2", "port": "2", "updated_at": stamp}
+        ],
+        "backup_connected_switches": [
+            {"backup_id": "bk-1", "switch_id": "sw-2", "port": "3", "updated_at": stamp}
+        ],
+        "network_connected_components": [
+            {"switch_id": "sw-1", "port": "1", "component_id": "srv-1", "updated_at": stamp},
+            {"switch_id": "sw-1", "port": "2", "component_id": "srv-2", "updated_at": stamp},
+            {"switch_id": "sw-2", "port": "1", "component_id": "srv-1", "updated_at": stamp},
+            {"switch_id": "sw-2", "port": "2", "component_id": "st-1", "updated_at": stamp},
+            {"switch_id": "sw-2", "port": "3", "component_id": "bk-1", "updated_at": stamp}
+        ]
+    }
+
+
+@pytest.fixture
+def postgrest():
+    stub = PostgrestStub(topology_tables())
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def client(postgrest):
+    client = SupabaseClient(postgrest.url, "test-key", pool_size=9, timeout=5)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def fetch_separately(client):
+    """The nine-request path: every table with select=*, joined client-side"""
+    def fetch():
+        tables = {}
+        for table in TOPOLOGY_TABLES:
+            resp = client.get(table, params={"select": "*"})
+            resp.raise_for_status()
+            tables[table] = resp.json()
+        return build_snapshot(tables)
+    return fetch
@@ -0,0 +1,118 @@
+import json
+import time
+import asyncio
+import threading
+
+import websockets
+
+from change_feed import ChangeFeedMonitor, WebSocketChangeSource
+from delta_sync import IncrementalSync
+
+
+class Recorder:
+    """update_function that remembers every snapshot it was given"""
+
+    def __init__(self):
+        self.snapshots = []
+        self.updated = threading.Event()
+
+    def __call__(self, data):
+        self.snapshots.append(data)
+        self.updated.set()
+
+
+class FallbackMonitor:
+    def __init__(self):
+        self.running = False
+        self.started = threading.Event()
+
+    def start(self):
+        self.running = True
+        self.started.set()
+
+    def stop(self):
+        self.running = False
+
+
+def serve_changes(messages):
+    """Websocket server that sends messages to each client, then stays open; returns (url, stop)"""
+    ready = threading.Event()
+    state = {}
+
+    async def handler(ws):
+        for message in messages:
+            await ws.send(json.dumps(message))
+        await ws.wait_closed()
+
+    async def main():
+        stop = asyncio.Event()
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            state["url"] = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            state["stop"] = lambda: loop.call_soon_threadsafe(stop.set)
+            ready.set()
+            await stop.wait()
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(main(),), daemon=True)
+    thread.start()
+    ready.wait(5)
+    return state["url"], state["stop"]
+
+
+def test_websocket_changes_are_applied_and_rendered_once(postgrest, client):
+    record = dict(postgrest.tables["servers"][1], health="Healthy", updated_at="2025-01-02T00:00:00+00:00")
+    url, stop = serve_changes([
+        {"table": "servers", "type": "UPDATE", "record": record, "old_record": {"id": "srv-2"}},
+        {"table": "servers", "type": "DELETE", "record": None, "old_record": {"id": "srv-3"}}
+    ])
+    recorder = Recorder()
+    monitor = ChangeFeedMonitor(recorder, WebSocketChangeSource(url), IncrementalSync(client), debounce=0.2)
+    try:
+        monitor.start()
+        assert len(recorder.snapshots) == 1  # the initial sync
+        recorder.updated.clear()
+        assert recorder.updated.wait(5)
+        # Let any further (wrongly un-coalesced) renders happen before counting
+        time.sleep(monitor.debounce * 3)
+        assert monitor.events_applied == 2
+        # The initial render plus one debounced render for the resync and both events
+        assert len(recorder.snapshots) == 2
+        servers = {server["id"]: server for server in recorder.snapshots[-1]["servers"]}
+        assert servers["srv-2"]["health"] == "Healthy"
+        assert "srv-3" not in servers
+    finally:
+        monitor.stop()
+        stop()
+
+
+def test_resync_after_subscribing_runs_off_the_event_loop(postgrest, client):
+    url, stop = serve_changes([])
+    store = IncrementalSync(client)
+    monitor = ChangeFeedMonitor(Recorder(), WebSocketChangeSource(url), store, debounce=0.05)
+    threads = []
+    sync = store.sync
+    store.sync = lambda: threads.append(threading.current_thread()) or sync()
+    try:
+        monitor.start()
+        for _ in range(100):
+            if len(threads) == 2:
+                break
+            time.sleep(0.05)
+        # start() syncs on the caller's thread, the catch-up after subscribing on the render thread
+        assert threads == [threading.current_thread(), monitor._render_thread]
+    finally:
+        monitor.stop()
+        stop()
+
+
+def test_falls_back_to_polling_when_the_feed_cannot_connect(postgrest, client):
+    fallback = FallbackMonitor()
+    monitor = ChangeFeedMonitor(
+        Recorder(), WebSocketChangeSource("ws://127.0.0.1:9/"), IncrementalSync(client), fallback=fallback
+    )
+    try:
+        monitor.start()
+        assert fallback.started.wait(5)
+    finally:
+        monitor.stop()
+    assert not fallback.running
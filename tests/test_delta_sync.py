@@ -0,0 +1,113 @@
+from delta_sync import IncrementalSync
+
+LATER = "2025-01-02T00:00:00+00:00"
+
+
+def servers(sync):
+    return {server["id"]: server for server in sync.snapshot()["servers"]}
+
+
+def test_first_sync_matches_full_fetch(postgrest, client, fetch_separately):
+    sync = IncrementalSync(client)
+    assert sync.sync() == fetch_separately()
+
+
+def test_delta_sync_picks_up_updated_rows(postgrest, client, fetch_separately):
+    sync = IncrementalSync(client)
+    sync.sync()
+    postgrest.tables["servers"][0].update(health="Critical", updated_at=LATER)
+    postgrest.requests.clear()
+    data = sync.sync()
+    assert dict(postgrest.requests)["servers"]["updated_at"] == "gte.2025-01-01T00:00:00+00:00"
+    assert servers(sync)["srv-1"]["health"] == "Critical"
+    assert data == fetch_separately()
+
+
+def test_rows_sharing_the_watermark_timestamp_are_not_skipped(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    # Committed after the first read, but stamped with the same updated_at as the watermark
+    stamp = sync.watermarks["servers"]
+    postgrest.tables["servers"].append({"id": "srv-4", "name": "Server 4", "health": "Healthy", "updated_at": stamp})
+    sync.sync()
+    assert "srv-4" in servers(sync)
+    # Rows already held at the watermark come back again but are not counted as changes
+    assert sync.last_changes == 1
+    sync.sync()
+    assert sync.last_changes == 0
+
+
+def test_reconcile_drops_deleted_rows(postgrest, client):
+    sync = IncrementalSync(client, reconcile_every=2)
+    sync.sync()
+    postgrest.tables["servers"] = [row for row in postgrest.tables["servers"] if row["id"] != "srv-3"]
+    sync.sync()
+    assert "srv-3" not in servers(sync)
+
+
+def test_apply_change_insert(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    record = {"id": "srv-4", "name": "Server 4", "health": "Healthy", "updated_at": LATER}
+    assert sync.apply_change("servers", "INSERT", record)
+    assert servers(sync)["srv-4"]["health"] == "Healthy"
+    assert sync.watermarks["servers"] == LATER
+    assert sync.apply_change("server_connected_switches", "insert",
+                             {"server_id": "srv-4", "switch_id": "sw-1", "port": "3", "updated_at": LATER})
+    assert servers(sync)["srv-4"]["connected_switches"] == [{"switch_id": "sw-1", "port": "3"}]
+
+
+def test_apply_change_update(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    record = dict(postgrest.tables["servers"][0], health="Critical", updated_at=LATER)
+    assert sync.apply_change("servers", "UPDATE", record, {"id": "srv-1"})
+    assert servers(sync)["srv-1"]["health"] == "Critical"
+    # The same row again changes nothing
+    assert not sync.apply_change("servers", "UPDATE", record, {"id": "srv-1"})
+
+
+def test_apply_change_update_moving_a_connection(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    old = {"server_id": "srv-2", "switch_id": "sw-1", "port": "2"}
+    new = dict(old, switch_id="sw-2", port="4", updated_at=LATER)
+    assert sync.apply_change("server_connected_switches", "UPDATE", new, old)
+    assert servers(sync)["srv-2"]["connected_switches"] == [{"switch_id": "sw-2", "port": "4"}]
+
+
+def test_apply_change_delete(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    assert sync.apply_change("servers", "DELETE", None, {"id": "srv-3"})
+    assert "srv-3" not in servers(sync)
+    assert not sync.apply_change("servers", "DELETE", None, {"id": "srv-3"})
+    assert not sync.apply_change("unknown_table", "DELETE", None, {"id": "srv-1"})
+
+
+def test_delete_without_full_old_record_reloads_the_table(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    postgrest.tables["server_connected_switches"].pop(0)
+    postgrest.requests.clear()
+    # Without REPLICA IDENTITY FULL a connection row delete only carries part of its key
+    assert sync.apply_change("server_connected_switches", "DELETE", None, {"server_id": "srv-1"})
+    assert postgrest.requests == [("server_connected_switches", {"select": "*"})]
+    assert servers(sync)["srv-1"]["connected_switches"] == [{"switch_id": "sw-2", "port": "1"}]
+
+
+def test_reload_table(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    postgrest.tables["storage"] = [{"id": "st-2", "name": "Storage 2", "health": "Healthy", "updated_at": LATER}]
+    sync.reload_table("storage")
+    assert [row["id"] for row in sync.snapshot()["storage"]] == ["st-2"]
+    assert sync.watermarks["storage"] == LATER
+
+
+def test_reload_table_keeps_rows_when_the_fetch_fails(postgrest, client):
+    sync = IncrementalSync(client)
+    sync.sync()
+    del postgrest.tables["storage"]
+    sync.reload_table("storage")
+    assert [row["id"] for row in sync.snapshot()["storage"]] == ["st-1"]
@@ -0,0 +1,39 @@
+from embedded_fetch import fetch_embedded_table, fetch_embedded_topology
+
+
+def test_embedded_fetch_matches_separate_fetch(postgrest, client, fetch_separately):
+    embedded = fetch_embedded_topology(client)
+    assert embedded == fetch_separately()
+    servers = {server["id"]: server for server in embedded["servers"]}
+    assert servers["srv-1"]["connected_switches"] == [
+        {"switch_id": "sw-1", "port": "1"}, {"switch_id": "sw-2", "port": "1"}
+    ]
+    assert servers["srv-3"]["connected_switches"] == []
+    switches = {switch["id"]: switch for switch in embedded["network_switches"]}
+    assert switches["sw-2"]["connected_components"] == {"1": "srv-1", "2": "st-1", "3": "bk-1"}
+
+
+def test_embedded_fetch_uses_one_request_per_component_table(postgrest, client):
+    fetch_embedded_topology(client)
+    requested = sorted(table for table, _ in postgrest.requests)
+    assert requested == ["backup", "network_switches", "private_cloud", "servers", "storage"]
+    selects = dict(postgrest.requests)
+    assert selects["servers"]["select"] == "*,server_connected_switches(switch_id,port)"
+    assert selects["network_switches"]["select"] == "*,network_connected_components(port,component_id)"
+
+
+def test_falls_back_to_separate_fetch_when_embedding_is_rejected(postgrest, client, fetch_separately):
+    expected = fetch_separately()
+    postgrest.embedding = False
+    postgrest.requests.clear()
+    assert fetch_embedded_topology(client) == expected
+    # Each component table: the rejected embedded select, then itself and its connection table
+    assert len(postgrest.requests) == 1 + 4 * 3
+
+
+def test_failed_table_returns_empty_list(postgrest, client):
+    del postgrest.tables["storage"]
+    assert fetch_embedded_table(client, "storage") == []
+    data = fetch_embedded_topology(client)
+    assert data["storage"] == []
+    assert len(data["servers"]) == 3
@@ -0,0 +1,58 @@
+import copy
+
+from live_view import diff_figures
+
+
+def figure():
+    return {
+        "data": [
+            {"type": "scatter", "name": "Servers", "x": [0.1, 0.1, 0.1], "y": [0.9, 0.5, 0.1],
+             "marker": {"color": ["green", "green", "orange"], "size": 12}},
+            {"type": "scatter", "name": "Edges", "x": [0.1, 0.5, None], "y": [0.9, 0.5, None],
+             "line": {"color": "green"}}
+        ],
+        "layout": {"title": {"text": "Topology"}, "uirevision": "topology"}
+    }
+
+
+def test_identical_figures_need_no_patches():
+    assert diff_figures(figure(), figure()) == []
+
+
+def test_only_changed_points_are_patched():
+    new = figure()
+    new["data"][0]["marker"]["color"][2] = "red"
+    new["data"][1]["line"]["color"] = "red"
+    assert diff_figures(figure(), new) == [
+        [0, "marker.color", 2, "red"],
+        [1, "line.color", None, "red"]
+    ]
+
+
+def test_resized_arrays_and_reshaped_attributes_are_sent_whole():
+    new = figure()
+    new["data"][0]["x"] = [0.1, 0.1]
+    new["data"][0]["marker"] = {"color": ["green", "green", "orange"], "size": 12, "symbol": "square"}
+    assert diff_figures(figure(), new) == [
+        [0, "x", None, [0.1, 0.1]],
+        [0, "marker", None, new["data"][0]["marker"]]
+    ]
+
+
+def test_patches_always_carry_an_attribute_path():
+    new = figure()
+    new["data"][0]["name"] = "Hosts"
+    assert all(patch[1] for patch in diff_figures(figure(), new))
+
+
+def test_shape_changes_need_the_full_figure():
+    assert diff_figures(None, figure()) is None
+    new = figure()
+    new["layout"]["title"]["text"] = "Other"
+    assert diff_figures(figure(), new) is None
+    new = figure()
+    new["data"].append(copy.deepcopy(new["data"][1]))
+    assert diff_figures(figure(), new) is None
+    new = figure()
+    new["data"][1]["hoverinfo"] = "text"
+    assert diff_figures(figure(), new) is None
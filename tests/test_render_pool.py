@@ -0,0 +1,49 @@
+import time
+
+from render_pool import RendererPool
+
+
+def sleep_then(value, seconds):
+    time.sleep(seconds)
+    return value
+
+
+def fail():
+    raise ValueError("renderer failed")
+
+
+def worker_state():
+    import combined_topology
+    return {
+        "render_worker": combined_topology.RENDER_WORKER,
+        "supabase": combined_topology.supabase,
+        "data_source": combined_topology.data_source,
+        "positions_loaded": combined_topology.position_cache._loaded
+    }
+
+
+def test_timed_out_renderer_gives_none_and_gets_a_fresh_worker():
+    pool = RendererPool({"slow": 0.5, "fast": 10})
+    try:
+        results = pool.run({"slow": (sleep_then, ("stale", 2)), "fast": (sleep_then, ("png", 0))})
+        assert results == {"slow": None, "fast": "png"}
+        assert pool.run({"slow": (sleep_then, ("html", 0))}) == {"slow": "html"}
+    finally:
+        pool.shutdown()
+
+
+def test_failed_renderer_gives_none():
+    pool = RendererPool({"png": 10}, use_processes=False)
+    try:
+        assert pool.run({"png": (fail, ())}) == {"png": None}
+    finally:
+        pool.shutdown()
+
+
+def test_render_workers_skip_the_data_setup():
+    pool = RendererPool({"state": 60})
+    try:
+        state = pool.run({"state": (worker_state, ())})["state"]
+    finally:
+        pool.shutdown()
+    assert state == {"render_worker": True, "supabase": None, "data_source": None, "positions_loaded": False}
@@ -0,0 +1,91 @@
+import copy
+
+from topology_delta import apply_delta, diff_snapshots
+
+
+def snapshot():
+    return {
+        "private_cloud": {"id": 1, "name": "HPE Private Cloud"},
+        "servers": [
+            {"id": "srv-1", "health": "Healthy",
+             "connected_switches": [{"switch_id": "sw-1", "port": "1"}, {"switch_id": "sw-2", "port": "1"}]},
+            {"id": "srv-2", "health": "Critical", "connected_switches": [{"switch_id": "sw-1", "port": "2"}]},
+            {"id": "srv-3", "health": "Healthy", "connected_switches": []}
+        ],
+        "network_switches": [
+            {"id": "sw-1", "health": "Healthy", "connected_components": {"1": "srv-1", "2": "srv-2"}},
+            {"id": "sw-2", "health": "Healthy", "connected_components": {"1": "srv-1", "2": "st-1"}}
+        ],
+        "storage": [{"id": "st-1", "health": "Healthy", "connected_switches": [{"switch_id": "sw-2", "port": "2"}]}],
+        "backup": []
+    }
+
+
+def round_trip(old, new):
+    before = copy.deepcopy(old)
+    delta = diff_snapshots(old, new)
+    assert apply_delta(old, delta) == new
+    assert old == before  # the old snapshot is left untouched
+    return delta
+
+
+def test_unchanged_snapshots_give_an_empty_delta():
+    assert round_trip(snapshot(), snapshot()) == {"sections": {}}
+
+
+def test_field_change():
+    new = snapshot()
+    new["servers"][1]["health"] = "Healthy"
+    new["private_cloud"]["name"] = "Renamed"
+    delta = round_trip(snapshot(), new)
+    assert delta["sections"] == {"servers": {"changed": [{"id": "srv-2", "health": "Healthy"}]}}
+    assert delta["private_cloud"] == new["private_cloud"]
+
+
+def test_added_and_removed_components():
+    old = snapshot()
+    new = snapshot()
+    new["servers"] = [server for server in new["servers"] if server["id"] != "srv-3"]
+    new["servers"].append({"id": "srv-4", "health": "Warning", "connected_switches": [{"switch_id": "sw-2", "port": "3"}]})
+    new["network_switches"][1]["connected_components"]["3"] = "srv-4"
+    new["backup"].append({"id": "bk-1", "health": "Healthy", "connected_switches": []})
+    delta = round_trip(old, new)
+    assert delta["sections"]["servers"]["removed"] == ["srv-3"]
+    assert [comp["id"] for comp in delta["sections"]["servers"]["added"]] == ["srv-4"]
+    assert delta["sections"]["network_switches"] == {
+        "connections_added": [{"id": "sw-2", "port": "3", "component_id": "srv-4"}]
+    }
+    assert [comp["id"] for comp in delta["sections"]["backup"]["added"]] == ["bk-1"]
+
+
+def test_connection_moved_between_switches():
+    new = snapshot()
+    new["servers"][0]["connected_switches"] = [{"switch_id": "sw-2", "port": "1"}, {"switch_id": "sw-2", "port": "4"}]
+    del new["network_switches"][0]["connected_components"]["1"]
+    new["network_switches"][1]["connected_components"]["4"] = "srv-1"
+    delta = round_trip(snapshot(), new)
+    assert delta["sections"]["servers"] == {
+        "connections_added": [{"id": "srv-1", "switch_id": "sw-2", "port": "4"}],
+        "connections_removed": [{"id": "srv-1", "switch_id": "sw-1", "port": "1"}]
+    }
+    assert delta["sections"]["network_switches"] == {
+        "connections_added": [{"id": "sw-2", "port": "4", "component_id": "srv-1"}],
+        "connections_removed": [{"id": "sw-1", "port": "1", "component_id": "srv-1"}]
+    }
+
+
+def test_removed_field_is_reported_as_none():
+    new = snapshot()
+    del new["servers"][0]["health"]
+    delta = diff_snapshots(snapshot(), new)
+    assert delta["sections"]["servers"]["changed"] == [{"id": "srv-1", "health": None}]
+    assert apply_delta(snapshot(), delta)["servers"][0]["health"] is None
+
+
+def test_connection_removed_from_a_switch_without_connections():
+    data = snapshot()
+    del data["network_switches"][0]["connected_components"]
+    delta = {"sections": {"network_switches": {
+        "connections_removed": [{"id": "sw-1", "port": "1", "component_id": "srv-1"}]
+    }}}
+    assert apply_delta(data, delta)["network_switches"][0] == {"id": "sw-1", "health": "Healthy"}
@@ -0,0 +1,73 @@
+from topology_layout import PositionCache
+
+
+def snapshot(server_count=6):
+    servers = [
+        {"id": f"srv-{i}", "connected_switches": [{"switch_id": f"sw-{i % 2}", "port": str(i)}]}
+        for i in range(server_count)
+    ]
+    return {
+        "servers": servers,
+        "network_switches": [{"id": "sw-0"}, {"id": "sw-1"}],
+        "storage": [{"id": "st-0", "connected_switches": [{"switch_id": "sw-1", "port": "s"}]}],
+        "backup": []
+    }
+
+
+def test_first_layout_places_every_node_and_repeats_are_free(tmp_path):
+    cache = PositionCache(str(tmp_path / "layout.json"))
+    positions, node_size = cache.layout(snapshot())
+    assert set(positions) == {f"srv-{i}" for i in range(6)} | {"sw-0", "sw-1", "st-0"}
+    assert cache.placed == 9
+    assert 0 < node_size
+    assert cache.layout(snapshot())[0] == positions
+    assert cache.placed == 0
+
+
+def test_positions_survive_a_restart(tmp_path):
+    path = str(tmp_path / "layout.json")
+    positions, _ = PositionCache(path).layout(snapshot())
+    cache = PositionCache(path)
+    assert cache.layout(snapshot())[0] == positions
+    assert cache.placed == 0
+
+
+def test_only_new_nodes_are_placed_and_known_nodes_stay(tmp_path):
+    cache = PositionCache(str(tmp_path / "layout.json"))
+    before, _ = cache.layout(snapshot(server_count=4))
+    after, _ = cache.layout(snapshot(server_count=5))
+    assert cache.placed == 1
+    assert {node: after[node] for node in before} == before
+    assert after["srv-4"] not in before.values()
+
+
+def test_full_band_is_laid_out_again(tmp_path):
+    cache = PositionCache(str(tmp_path / "layout.json"))
+    # Six servers fill the single column of the server band
+    cache.layout(snapshot())
+    after, _ = cache.layout(snapshot(server_count=7))
+    servers = [after[f"srv-{i}"] for i in range(7)]
+    assert len(set(servers)) == 7
+
+
+def test_removed_nodes_free_their_cell(tmp_path):
+    cache = PositionCache(str(tmp_path / "layout.json"))
+    before, _ = cache.layout(snapshot())
+    data = snapshot()
+    data["servers"] = [server for server in data["servers"] if server["id"] != "srv-2"]
+    after, _ = cache.layout(data)
+    assert "srv-2" not in after
+    assert after == {node: position for node, position in before.items() if node != "srv-2"}
+    # The freed cell is the only one left in the band, so the returning server gets it back
+    again, _ = cache.layout(snapshot())
+    assert cache.placed == 1
+    assert again == before
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "layout.json"
+    path.write_text("not json", encoding="utf-8")
+    cache = PositionCache(str(path))
+    positions, _ = cache.layout(snapshot())
+    assert len(positions) == 9
+    assert cache.placed == 9
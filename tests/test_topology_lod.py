@@ -0,0 +1,94 @@
+import pytest
+
+from topology_lod import aggregate_snapshot, group_snapshot, health_summary
+
+
+def server(server_id, location, health, switch_id, port):
+    return {"id": server_id, "name": server_id, "type": "KVM", "health": health, "power_status": "on",
+            "location": location, "connection_type": "ethernet",
+            "connected_switches": [{"switch_id": switch_id, "port": port}]}
+
+
+def snapshot():
+    servers = [
+        server("srv-1", "dc-1", "healthy", "sw-1", "1"),
+        server("srv-2", "dc-1", "healthy", "sw-1", "2"),
+        server("srv-3", "dc-1", "healthy", "sw-1", "3"),
+        server("srv-4", "dc-1", "degraded", "sw-1", "4"),
+        server("srv-5", "dc-1", "critical", "sw-1", "5"),
+        server("srv-6", "dc-2", "healthy", "sw-2", "1"),
+        server("srv-7", "dc-2", "healthy", "sw-2", "2"),
+        server("srv-8", "dc-3", "healthy", "sw-2", "3")
+    ]
+    switches = [
+        {"id": "sw-1", "name": "sw-1", "switch_type": "ToR", "health": "healthy", "location": "dc-1",
+         "connected_components": {s["connected_switches"][0]["port"]: s["id"] for s in servers[:5]}},
+        {"id": "sw-2", "name": "sw-2", "switch_type": "ToR", "health": "healthy", "location": "dc-2",
+         "connected_components": {s["connected_switches"][0]["port"]: s["id"] for s in servers[5:]}}
+    ]
+    return {"private_cloud": {"name": "Cloud"}, "servers": servers, "network_switches": switches,
+            "storage": [], "backup": []}
+
+
+def rows(view, section):
+    return {row["id"]: row for row in view[section]}
+
+
+def test_large_sections_become_supernodes_with_rolled_up_health():
+    view = aggregate_snapshot(snapshot(), section_limit=3)
+    servers = rows(view, "servers")
+    # dc-1 and dc-2 collapse; the critical server and the single dc-3 server stay individual
+    assert set(servers) == {"group:servers:dc-1", "group:servers:dc-2", "srv-5", "srv-8"}
+    dc1 = servers["group:servers:dc-1"]
+    assert dc1["members"] == ["srv-1", "srv-2", "srv-3", "srv-4", "srv-5"]
+    assert dc1["health_counts"] == {"healthy": 3, "degraded": 1, "critical": 1}
+    assert dc1["health_summary"] == "3 healthy / 1 degraded / 1 critical"
+    # Health is the worst of the members still drawn inside the group
+    assert dc1["health"] == "degraded"
+    assert dc1["power_status"] == "5/5 on"
+    assert servers["group:servers:dc-2"]["health"] == "healthy"
+    # The small switch section is left as it is
+    assert set(rows(view, "network_switches")) == {"sw-1", "sw-2"}
+
+
+def test_edges_are_merged_per_supernode_and_switch():
+    view = aggregate_snapshot(snapshot(), section_limit=3)
+    servers = rows(view, "servers")
+    assert servers["group:servers:dc-1"]["connected_switches"] == [{"switch_id": "sw-1", "port": "4 links"}]
+    assert servers["srv-5"]["connected_switches"] == [{"switch_id": "sw-1", "port": "5"}]
+    assert rows(view, "network_switches")["sw-1"]["connected_components"] == {
+        "1": "group:servers:dc-1", "2": "group:servers:dc-1", "3": "group:servers:dc-1",
+        "4": "group:servers:dc-1", "5": "srv-5"
+    }
+
+
+def test_critical_components_can_be_kept_inside_groups():
+    view = aggregate_snapshot(snapshot(), section_limit=3, keep_critical=False)
+    servers = rows(view, "servers")
+    assert "srv-5" not in servers
+    assert servers["group:servers:dc-1"]["health"] == "critical"
+
+
+def test_small_topology_is_unchanged():
+    data = snapshot()
+    assert aggregate_snapshot(data, section_limit=40) == data
+
+
+def test_unknown_group_key_is_rejected():
+    with pytest.raises(ValueError):
+        aggregate_snapshot(snapshot(), group_by="rack")
+
+
+def test_group_snapshot_rebuilds_the_members_and_their_switches():
+    data = snapshot()
+    view = aggregate_snapshot(data, section_limit=3)
+    detail = group_snapshot(data, view, "group:servers:dc-1")
+    assert [row["id"] for row in detail["servers"]] == ["srv-1", "srv-2", "srv-3", "srv-4", "srv-5"]
+    assert [row["id"] for row in detail["network_switches"]] == ["sw-1"]
+    assert detail["servers"][0] is data["servers"][0]
+    assert group_snapshot(data, view, "srv-5") is None
+    assert group_snapshot(data, view, "group:servers:missing") is None
+
+
+def test_health_summary_lists_healthy_first():
+    assert health_summary({"critical": 2, "healthy": 5, "unknown": 1}) == "5 healthy / 1 unknown / 2 critical"
@@ -0,0 +1,133 @@
+"""
+Component-level deltas between two topology snapshots.
+
+Both snapshots have the shape fetch_data_from_supabase returns. A delta
+lists, per section, only what differs:
+
+    {"private_cloud": {...},                       # only if it changed
+     "sections": {
+        "servers": {
+            "added":   [<full component>, ...],
+            "removed": [<id>, ...],
+            "changed": [{"id": <id>, <field>: <new value>, ...}, ...],
+            "connections_added":   [{"id": <id>, "switch_id": ..., "port": ...}, ...],
+            "connections_removed": [{"id": <id>, "switch_id": ..., "port": ...}, ...]
+        },
+        "network_switches": {
+            ...
+            "connections_added":   [{"id": <id>, "port": ..., "component_id": ...}, ...],
+            ...
+        }}}
+
+Empty lists and unchanged sections are left out, so a few health flips
+cost a few hundred bytes. Connections of added and removed components
+travel with the component itself; the connection lists only cover
+components present on both sides. A field that disappears from a component
+is reported as None. apply_delta() turns the old snapshot into the new one
+(added components go to the end of their section).
+"""
+
+COMPONENT_SECTIONS = ("servers", "network_switches", "storage", "backup")
+CONNECTION_FIELDS = ("connected_switches", "connected_components")
+
+
+def _connections(section, comp):
+    """Hashable connection keys of a component, mapped to their delta entries"""
+    if section == "network_switches":
+        return {
+            (port, component_id): {"id": comp["id"], "port": port, "component_id": component_id}
+            for port, component_id in (comp.get("connected_components") or {}).items()
+        }
+    return {
+        (conn["switch_id"], conn["port"]): {"id": comp["id"], "switch_id": conn["switch_id"], "port": conn["port"]}
+        for conn in comp.get("connected_switches") or ()
+    }
+
+
+def _diff_section(section, old_items, new_items):
+    old_by_id = {comp["id"]: comp for comp in old_items}
+    new_by_id = {comp["id"]: comp for comp in new_items}
+    changes = {
+        "added": [comp for comp_id, comp in new_by_id.items() if comp_id not in old_by_id],
+        "removed": [comp_id for comp_id in old_by_id if comp_id not in new_by_id],
+        "changed": [],
+        "connections_added": [],
+        "connections_removed": []
+    }
+    for comp_id, new in new_by_id.items():
+        old = old_by_id.get(comp_id)
+        if old is None or old == new:
+            continue
+        fields = {
+            key: new.get(key) for key in old.keys() | new.keys()
+            if key not in CONNECTION_FIELDS and old.get(key) != new.get(key)
+        }
+        if fields:
+            changes["changed"].append({"id": comp_id, **fields})
+        old_connections, new_connections = _connections(section, old), _connections(section, new)
+        changes["connections_added"].extend(
+            entry for key, entry in new_connections.items() if key not in old_connections
+        )
+        changes["connections_removed"].extend(
+            entry for key, entry in old_connections.items() if key not in new_connections
+        )
+    return {kind: entries for kind, entries in changes.items() if entries}
+
+
+def diff_snapshots(old, new):
+    """Delta turning snapshot old into snapshot new"""
+    delta = {"sections": {}}
+    if old.get("private_cloud") != new.get("private_cloud"):
+        delta["private_cloud"] = new.get("private_cloud")
+    for section in COMPONENT_SECTIONS:
+        changes = _diff_section(section, old.get(section, []), new.get(section, []))
+        if changes:
+            delta["sections"][section] = changes
+    return delta
+
+
+def apply_delta(data, delta):
+    """New snapshot with delta applied; data itself is not modified"""
+    result = dict(data)
+    if "private_cloud" in delta:
+        result["private_cloud"] = delta["private_cloud"]
+    for section, changes in delta.get("sections", {}).items():
+        by_id = {comp["id"]: comp for comp in data.get(section, [])}
+        for comp_id in changes.get("removed", ()):
+            by_id.pop(comp_id, None)
+        touched = {}
+
+        def _copy(comp_id):
+            # Copy a component (and its connections) the first time the delta touches it
+            if comp_id not in touched:
+                comp = dict(by_id[comp_id])
+                if "connected_switches" in comp:
+                    comp["connected_switches"] = list(comp["connected_switches"])
+                if "connected_components" in comp:
+                    comp["connected_components"] = dict(comp["connected_components"])
+                touched[comp_id] = by_id[comp_id] = comp
+            return touched[comp_id]
+
+        for entry in changes.get("changed", ()):
+            _copy(entry["id"]).update(entry)
+        for entry in changes.get("connections_removed", ()):
+            comp = _copy(entry["id"])
+            if section == "network_switches":
+                comp.get("connected_components", {}).pop(entry["port"], None)
+            else:
+                comp["connected_switches"] = [
+                    conn for conn in comp.get("connected_switches") or ()
+                    if (conn["switch_id"], conn["port"]) != (entry["switch_id"], entry["port"])
+                ]
+        for entry in changes.get("connections_added", ()):
+            comp = _copy(entry["id"])
+            if section == "network_switches":
+                comp.setdefault("connected_components", {})[entry["port"]] = entry["component_id"]
+            else:
+                comp.setdefault("connected_switches", []).append(
+                    {"switch_id": entry["switch_id"], "port": entry["port"]}
+                )
+        for comp in changes.get("added", ()):
+            by_id[comp["id"]] = comp
+        result[section] = list(by_id.values())
+    return result
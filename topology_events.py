@@ -0,0 +1,127 @@
+"""
+Push fan-out of topology changes to streaming clients (SSE, websocket).
+
+One producer, the snapshot refresh worker, publishes an Event per new
+snapshot version. The event is serialized once, and its SSE frame is built
+once, so fan-out only hands the same bytes to every subscriber's queue.
+
+Each subscriber has its own bounded queue and publishing never blocks. A
+client too slow to drain its queue loses the backlog, and its stream
+resynchronizes with one catch-up event (the delta since the last version it
+was sent, or the full snapshot) instead of stalling the producer or the
+other clients. Idle streams get a heartbeat every few seconds, which also
+lets the server notice clients that went away.
+"""
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of a subscriber's backlog when it overflows
+RESYNC = object()
+
+
+class Event:
+    __slots__ = ("name", "version", "text", "sse")
+
+    def __init__(self, name, version, data):
+        """data is the serialized JSON payload (bytes)"""
+        data = data.rstrip(b"\n")
+        self.name = name
+        self.version = version
+        self.text = data.decode("utf-8")
+        self.sse = b"event: %s\nid: %d\ndata: %s\n\n" % (name.encode("ascii"), version, data)
+
+
+class Subscriber:
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.overflows = 0
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            pass
+        # Too slow to keep up: drop what it has not read and let it catch up in one go
+        self.overflows += 1
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(RESYNC)
+        except queue.Full:
+            pass
+        return False
+
+    def next(self, timeout):
+        """Next event, RESYNC, or None after timeout seconds without one"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroadcaster:
+    def __init__(self, buffer_size=16):
+        self.buffer_size = buffer_size
+        self.published = 0
+        self.overflows = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = Subscriber(self.buffer_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if not subscriber.offer(event):
+                self.overflows += 1
+                logger.warning(f"Stream client fell {self.buffer_size} events behind; it will resync")
+        self.published += 1
+
+    def stream(self, current, since=None, heartbeat=15):
+        """Events for one client: current(since) first, then every newer published event.
+
+        current(version) builds the catch-up Event from a client version (None for a full snapshot) and
+        is called again after an overflow. None is yielded after heartbeat idle seconds. The subscription
+        ends when the generator is closed.
+        """
+        subscriber = self.subscribe()
+        try:
+            event = current(since)
+            sent = event.version
+            yield event
+            while True:
+                item = subscriber.next(heartbeat)
+                if item is RESYNC:
+                    event = current(sent)
+                elif item is None or item.version <= sent:
+                    # Idle, or already covered by the catch-up event
+                    event = None
+                else:
+                    event = item
+                if event is not None:
+                    sent = event.version
+                yield event
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self._lock:
+            clients = len(self._subscribers)
+        return {"clients": clients, "published": self.published, "overflows": self.overflows,
+                "buffer_size": self.buffer_size}
@@ -0,0 +1,91 @@
+"""
+Hash-indexed joins between the component tables and their connection tables.
+
+Each connection table is grouped once by its foreign key, so attaching
+connections to components costs O(components + connections) instead of
+scanning the whole connection table for every component.
+"""
+from collections import defaultdict
+
+COMPONENT_TABLES = ["servers", "network_switches", "storage", "backup"]
+
+# Every table a topology snapshot is built from
+TOPOLOGY_TABLES = [
+    "private_cloud",
+    "servers",
+    "network_switches",
+    "storage",
+    "backup",
+    "server_connected_switches",
+    "storage_connected_switches",
+    "backup_connected_switches",
+    "network_connected_components"
+]
+
+# Foreign key used by each connection table
+CONNECTION_KEYS = {
+    "server_connected_switches": "server_id",
+    "storage_connected_switches": "storage_id",
+    "backup_connected_switches": "backup_id",
+    "network_connected_components": "switch_id"
+}
+
+
+def group_by(rows, key):
+    """Group rows by the value of key in a single pass, keeping row order within each group"""
+    index = defaultdict(list)
+    for row in rows:
+        index[row.get(key)].append(row)
+    return index
+
+
+def attach_connected_switches(components, connections, key):
+    """Set component["connected_switches"] from a *_connected_switches table"""
+    index = group_by(connections, key)
+    for comp in components:
+        comp["connected_switches"] = [
+            {"switch_id": conn["switch_id"], "port": conn["port"]}
+            for conn in index.get(comp.get("id"), ())
+        ]
+
+
+def attach_connected_components(network_switches, connections):
+    """Set switch["connected_components"] (port -> component id) from network_connected_components"""
+    index = group_by(connections, CONNECTION_KEYS["network_connected_components"])
+    for switch in network_switches:
+        switch["connected_components"] = {
+            conn["port"]: conn["component_id"]
+            for conn in index.get(switch.get("id"), ())
+        }
+
+
+def join_connections(servers, storage, backup, network_switches,
+                     server_connections, storage_connections, backup_connections,
+                     network_connections=None):
+    """Attach all connection tables to their components in place"""
+    attach_connected_switches(servers, server_connections, CONNECTION_KEYS["server_connected_switches"])
+    attach_connected_switches(storage, storage_connections, CONNECTION_KEYS["storage_connected_switches"])
+    attach_connected_switches(backup, backup_connections, CONNECTION_KEYS["backup_connected_switches"])
+    if network_connections is not None:
+        attach_connected_components(network_switches, network_connections)
+
+
+def build_snapshot(tables):
+    """Join {table_name: rows} for TOPOLOGY_TABLES into the fetch_data_from_supabase() structure"""
+    private_cloud = tables.get("private_cloud") or []
+    servers = tables.get("servers", [])
+    network_switches = tables.get("network_switches", [])
+    storage = tables.get("storage", [])
+    backup = tables.get("backup", [])
+    join_connections(
+        servers, storage, backup, network_switches,
+        tables.get("server_connected_switches", []), tables.get("storage_connected_switches", []),
+        tables.get("backup_connected_switches", []), tables.get("network_connected_components", [])
+    )
+    return {
+        "private_cloud": private_cloud[0] if private_cloud else {},
+        "servers": servers,
+        "network_switches": network_switches,
+        "storage": storage,
+        "backup": backup
+    }
@@ -0,0 +1,288 @@
+"""
+Tiered layered layout for the interactive topology.
+
+Components keep their tier as a hard constraint: servers in the left band,
+switches in the middle band, storage then backup in the right band. Within a
+band, nodes are ordered by the barycenter heuristic (a few sweeps that move
+each node towards the mean position of its neighbours in the other tiers,
+which removes most edge crossings) and then placed on a grid that fits the
+band: a single column with the classic y_step spacing while it fits, more
+sub-columns and tighter spacing as the band fills up.
+
+All per-sweep work is NumPy array math over the edge list, so 10k nodes lay
+out in a few tens of milliseconds.
+
+PositionCache keeps the grid cell of every component id on disk between
+runs. Known nodes keep their cell, removed nodes free theirs and new nodes
+take the free cell closest to their neighbours, so a refresh only does
+layout work for churn and nothing shifts under the operator. The band grids
+are allocated with spare cells; a full relayout only happens on the first
+run or when a band runs out of cells.
+"""
+import os
+import json
+import math
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (x range, y range) of each tier's band in plot coordinates
+TIER_BANDS = {
+    "left": ((0.02, 0.28), (0.02, 0.9)),
+    "middle": ((0.4, 0.6), (0.02, 0.9)),
+    "right": ((0.72, 0.98), (0.02, 0.9))
+}
+
+# Sections per band, top to bottom; each section keeps its own contiguous block
+TIERS = (
+    ("left", ("servers",)),
+    ("middle", ("network_switches",)),
+    ("right", ("storage", "backup"))
+)
+
+DEFAULT_Y_STEP = 0.15
+MAX_NODE_SIZE = 0.06
+
+
+def _neighbour_mean(position, src, dst, count, current):
+    """Mean position of each node's neighbours, keeping current where a node has none"""
+    totals = np.bincount(dst, weights=position[src], minlength=len(position))
+    totals += np.bincount(src, weights=position[dst], minlength=len(position))
+    return np.where(count > 0, totals / np.maximum(count, 1), current)
+
+
+def _grid(n, x_range, y_range, y_step, spare=0.0):
+    """Column-major grid for at least n cells in the band: [x0, x1, y1, dx, dy, columns, rows]"""
+    (x0, x1), (y0, y1) = x_range, y_range
+    width, height = x1 - x0, y1 - y0
+    fits = int(height // y_step) + 1
+    if n <= fits:
+        # One column at the classic spacing; spare cells are the rows left below it
+        columns, rows = 1, max(fits if spare else n, 1)
+        dy = y_step
+    else:
+        cells = math.ceil(n * (1 + spare))
+        # Aim for roughly square cells in the band's aspect ratio
+        columns = max(1, min(cells, math.ceil(math.sqrt(cells * width / height))))
+        rows = math.ceil(cells / columns)
+        dy = height / max(rows - 1, 1)
+    dx = width / (columns - 1) if columns > 1 else width
+    return [x0, x1, y1, dx, dy, columns, rows]
+
+
+def _cell_positions(grid, cells):
+    x0, x1, y1, dx, dy, columns, rows = grid
+    cells = np.asarray(cells)
+    xs = np.full(len(cells), (x0 + x1) / 2) if columns == 1 else x0 + (cells // rows) * dx
+    return xs, y1 - (cells % rows) * dy
+
+
+def _grid_node_size(grid):
+    return min(grid[3], grid[4]) * 0.9
+
+
+def band_of(data):
+    """{component id: band} for every component in the snapshot"""
+    return {item["id"]: band for band, sections in TIERS for section in sections for item in data.get(section, [])}
+
+
+def order_bands(data, iterations=4):
+    """{band: [component ids top to bottom]} with each band ordered by barycenter sweeps"""
+    ids, groups = [], []
+    for band, sections in TIERS:
+        for section in sections:
+            start = len(ids)
+            ids.extend(item["id"] for item in data.get(section, []))
+            groups.append((band, np.arange(start, len(ids))))
+    index = {component_id: i for i, component_id in enumerate(ids)}
+
+    src, dst = [], []
+    for section in ("servers", "storage", "backup"):
+        for item in data.get(section, []):
+            for conn in item.get("connected_switches") or ():
+                j = index.get(conn["switch_id"])
+                if j is not None:
+                    src.append(index[item["id"]])
+                    dst.append(j)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    count = np.bincount(src, minlength=len(ids)) + np.bincount(dst, minlength=len(ids))
+
+    # Rank within each band, normalised to [0, 1]; starts from the source order
+    position = np.zeros(len(ids))
+    band_members = {}
+    for band, members in groups:
+        band_members.setdefault(band, []).append(members)
+    for blocks in band_members.values():
+        members = np.concatenate(blocks)
+        position[members] = np.arange(len(members)) / max(len(members) - 1, 1)
+
+    for _ in range(iterations if len(src) else 0):
+        target = _neighbour_mean(position, src, dst, count, position)
+        for blocks in band_members.values():
+            offset = 0
+            total = sum(len(block) for block in blocks)
+            for block in blocks:
+                # Sections stay in their block; only the order inside a block changes
+                order = block[np.argsort(target[block], kind="stable")]
+                position[order] = (offset + np.arange(len(block))) / max(total - 1, 1)
+                offset += len(block)
+
+    ordered = {}
+    for band, blocks in band_members.items():
+        members = np.concatenate(blocks)
+        ordered[band] = [ids[i] for i in members[np.argsort(position[members], kind="stable")]]
+    return ordered
+
+
+def layered_layout(data, iterations=4, y_step=DEFAULT_Y_STEP, bands=TIER_BANDS):
+    """Positions {component id: (x, y)} and the icon size that fits the densest band"""
+    positions = {}
+    node_size = MAX_NODE_SIZE
+    for band, ordered in order_bands(data, iterations).items():
+        if not ordered:
+            continue
+        grid = _grid(len(ordered), *bands[band], y_step)
+        xs, ys = _cell_positions(grid, np.arange(len(ordered)))
+        positions.update(zip(ordered, zip(xs.tolist(), ys.tolist())))
+        node_size = min(node_size, _grid_node_size(grid))
+    return positions, node_size
+
+
+class PositionCache:
+    def __init__(self, path=None, iterations=4, y_step=DEFAULT_Y_STEP, bands=TIER_BANDS, spare=0.25):
+        self.path = path
+        self.iterations = iterations
+        self.y_step = y_step
+        self.bands = bands
+        self.spare = spare
+        self.grids = {}   # band -> grid list from _grid()
+        self.cells = {}   # band -> {component id: cell}
+        self.placed = 0   # nodes placed by the last layout() call
+        self._loaded = False  # the file is read on first use, so processes that never lay out skip it
+
+    def _load(self):
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.grids = saved["grids"]
+            # Stored as [id, cell] pairs so non-string ids survive the round trip
+            self.cells = {band: {component_id: cell for component_id, cell in pairs} for band, pairs in saved["cells"].items()}
+            logger.info(f"Loaded {sum(len(c) for c in self.cells.values())} cached positions from {self.path}")
+        except Exception as e:
+            logger.error(f"Ignoring unreadable layout cache {self.path}: {e}")
+            self.grids, self.cells = {}, {}
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"grids": self.grids, "cells": {band: list(cells.items()) for band, cells in self.cells.items()}}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to write layout cache {self.path}: {e}")
+
+    def relayout(self, data, band=None):
+        """Lay out every band (or one band) from scratch"""
+        for name, ordered in order_bands(data, self.iterations).items():
+            if band is None or name == band:
+                self.grids[name] = _grid(len(ordered), *self.bands[name], self.y_step, self.spare)
+                self.cells[name] = {component_id: cell for cell, component_id in enumerate(ordered)}
+
+    def _neighbour_targets(self, data):
+        """{component id: [neighbour ids]} from both directions of the uplinks"""
+        neighbours = {}
+        for section in ("servers", "storage", "backup"):
+            for item in data.get(section, []):
+                for conn in item.get("connected_switches") or ():
+                    neighbours.setdefault(item["id"], []).append(conn["switch_id"])
+                    neighbours.setdefault(conn["switch_id"], []).append(item["id"])
+        return neighbours
+
+    def _place(self, band, new_ids, neighbours, positions):
+        """Put new_ids into the free cells of band nearest their neighbours; False when the band is full"""
+        grid = self.grids[band]
+        cells = self.cells[band]
+        capacity = grid[5] * grid[6]
+        occupied = np.zeros(capacity, dtype=bool)
+        occupied[list(cells.values())] = True
+        free = np.flatnonzero(~occupied)
+        if len(free) < len(new_ids):
+            return False
+        free_x, free_y = _cell_positions(grid, free)
+        for component_id in new_ids:
+            known = [positions[n] for n in neighbours.get(component_id, ()) if n in positions]
+            if known:
+                target_y = sum(p[1] for p in known) / len(known)
+                distance = np.abs(free_y - target_y) + 1e-3 * np.abs(free_x - (grid[0] + grid[1]) / 2)
+            else:
+                # Nothing to anchor to: first free cell, as if appended to the band
+                distance = free.astype(float)
+            distance = np.where(occupied[free], np.inf, distance)
+            best = int(np.argmin(distance))
+            cells[component_id] = int(free[best])
+            occupied[free[best]] = True
+            positions[component_id] = (float(free_x[best]), float(free_y[best]))
+        return True
+
+    def layout(self, data):
+        """Positions {component id: (x, y)} and icon size, reusing cached cells"""
+        if not self._loaded:
+            self._load()
+        bands = band_of(data)
+        present = {}
+        for component_id, band in bands.items():
+            present.setdefault(band, set()).add(component_id)
+        changed = False
+        self.placed = 0
+        if not self.grids:
+            self.relayout(data)
+            self.placed = len(bands)
+            changed = True
+
+        positions = {}
+        new_ids = {}
+        for band, members in present.items():
+            if band not in self.grids:
+                self.relayout(data, band)
+                self.placed += len(members)
+                changed = True
+            cells = self.cells[band]
+            for component_id in [c for c in cells if c not in members]:
+                del cells[component_id]
+                changed = True
+            known = [c for c in members if c in cells]
+            xs, ys = _cell_positions(self.grids[band], [cells[c] for c in known])
+            positions.update(zip(known, zip(xs.tolist(), ys.tolist())))
+            new_ids[band] = [c for c in members if c not in cells]
+        for band in [b for b in self.grids if b not in present]:
+            del self.grids[band], self.cells[band]
+            changed = True
+
+        if any(new_ids.values()):
+            neighbours = self._neighbour_targets(data)
+            # Switches first so new components can anchor to newly placed switches
+            for band in sorted(new_ids, key=lambda b: b != "middle"):
+                if not new_ids[band]:
+                    continue
+                # Keep the source order among the new nodes of a band
+                band_new = set(new_ids[band])
+                ordered = [item["id"] for section in dict(TIERS)[band] for item in data.get(section, []) if item["id"] in band_new]
+                if not self._place(band, ordered, neighbours, positions):
+                    logger.info(f"Layout band {band} is full, relaying it out")
+                    self.relayout(data, band)
+                    xs, ys = _cell_positions(self.grids[band], list(self.cells[band].values()))
+                    positions.update(zip(self.cells[band], zip(xs.tolist(), ys.tolist())))
+                self.placed += len(ordered)
+            changed = True
+
+        if changed:
+            self.save()
+        node_size = min([MAX_NODE_SIZE] + [_grid_node_size(self.grids[band]) for band in present])
+        return positions, node_size
@@ -0,0 +1,173 @@
+"""
+Level-of-detail aggregation for large topologies.
+
+aggregate_snapshot() turns a snapshot into an overview snapshot of the same
+shape, so the PNG and HTML renderers draw it unchanged:
+
+- each large section is grouped by location, type or (for servers, storage
+  and backup) the first switch they uplink to; every group becomes one
+  supernode row with id "group:<section>:<key>"
+- supernodes carry the member ids, rolled-up health counts and a summary
+  such as "24 healthy / 3 degraded / 1 critical"; their health (and so their
+  edge colour) is the worst health of the members still inside the group
+- critical components are pulled out of their group and stay individual
+- edges are merged per (supernode, switch or switch group) pair, with the
+  port replaced by the number of links they stand for
+
+The overview therefore has O(groups + critical components) nodes and edges.
+group_snapshot() rebuilds the full-detail snapshot of one group for drill
+down.
+"""
+from collections import Counter, defaultdict
+
+GROUP_KEYS = ("location", "type", "switch")
+COMPONENT_SECTIONS = ("servers", "network_switches", "storage", "backup")
+
+# Worst first; health values not listed rank below all of these
+HEALTH_ORDER = ("critical", "degraded", "unknown", "healthy")
+
+GROUP_PREFIX = "group:"
+
+
+def is_group(component_id):
+    return isinstance(component_id, str) and component_id.startswith(GROUP_PREFIX)
+
+
+def health_summary(counts):
+    ordered = sorted(counts.items(), key=lambda item: HEALTH_ORDER.index(item[0]) if item[0] in HEALTH_ORDER else -1)
+    return " / ".join(f"{count} {health}" for health, count in reversed(ordered))
+
+
+def _worst_health(members):
+    healths = {member.get("health", "unknown") for member in members}
+    for health in HEALTH_ORDER:
+        if health in healths:
+            return health
+    return next(iter(healths), "unknown")
+
+
+def _group_key(section, item, group_by):
+    if group_by == "switch" and section != "network_switches":
+        links = item.get("connected_switches") or []
+        return links[0]["switch_id"] if links else "unlinked"
+    if group_by == "type":
+        return item.get("type") or item.get("switch_type") or "unknown"
+    return item.get("location") or "unknown"
+
+
+def _supernode(section, key, members, displayed):
+    types = Counter(member.get("type", member.get("switch_type")) for member in members)
+    counts = Counter(member.get("health", "unknown") for member in members)
+    powered = sum(1 for member in members if member.get("power_status") == "on")
+    row = {
+        "id": f"{GROUP_PREFIX}{section}:{key}",
+        "name": f"{key} ({len(members)})",
+        "type": types.most_common(1)[0][0],
+        "role": "group",
+        "health": _worst_health(displayed),
+        "power_status": f"{powered}/{len(members)} on",
+        "location": key if all(member.get("location") == key for member in members) else "mixed",
+        "group_key": key,
+        "members": [member["id"] for member in members],
+        "health_counts": dict(counts),
+        "health_summary": health_summary(counts)
+    }
+    if section == "network_switches":
+        row["switch_type"] = row["type"]
+    else:
+        connection_types = Counter(member.get("connection_type") for member in members)
+        row["connection_type"] = connection_types.most_common(1)[0][0]
+    return row
+
+
+def aggregate_snapshot(data, group_by="location", section_limit=40, keep_critical=True):
+    """Overview snapshot with every section larger than section_limit collapsed into supernodes"""
+    if group_by not in GROUP_KEYS:
+        raise ValueError(f"Unknown group key {group_by}; expected one of {GROUP_KEYS}")
+    view = {"private_cloud": data.get("private_cloud") or {}}
+    mapping = {}  # component id -> id of the row that represents it in the view
+    for section in COMPONENT_SECTIONS:
+        items = data.get(section, [])
+        if len(items) <= section_limit:
+            view[section] = [dict(item) for item in items]
+            mapping.update((item["id"], item["id"]) for item in items)
+            continue
+        groups = defaultdict(list)
+        for item in items:
+            groups[_group_key(section, item, group_by)].append(item)
+        rows = []
+        for key, members in groups.items():
+            displayed = [m for m in members if not (keep_critical and m.get("health") == "critical")]
+            if len(displayed) > 1:
+                row = _supernode(section, key, members, displayed)
+                rows.append(row)
+                mapping.update((member["id"], row["id"]) for member in displayed)
+            for member in members:
+                if member["id"] not in mapping:
+                    rows.append(dict(member))
+                    mapping[member["id"]] = member["id"]
+        view[section] = rows
+
+    # Merge uplinks per (view row, view switch) and count the links each one stands for
+    links = defaultdict(Counter)
+    ports = {}
+    for section in ("servers", "storage", "backup"):
+        for item in data.get(section, []):
+            source = mapping.get(item["id"])
+            for conn in item.get("connected_switches") or ():
+                target = mapping.get(conn["switch_id"], conn["switch_id"])
+                links[source][target] += 1
+                ports[(source, target)] = conn["port"]
+    switch_links = defaultdict(dict)
+    for section in ("servers", "storage", "backup"):
+        for row in view[section]:
+            row["connected_switches"] = [
+                {"switch_id": target, "port": ports[(row["id"], target)] if count == 1 and not is_group(row["id"]) else f"{count} links"}
+                for target, count in links.get(row["id"], {}).items()
+            ]
+            for conn in row["connected_switches"]:
+                switch_links[conn["switch_id"]][f"{row['id']}:{conn['port']}"] = row["id"]
+    for row in view["network_switches"]:
+        if row.get("members"):
+            row["connected_components"] = switch_links.get(row["id"], {})
+        else:
+            row["connected_components"] = {
+                port: mapping.get(component_id, component_id)
+                for port, component_id in (row.get("connected_components") or {}).items()
+            }
+    return view
+
+
+def find_group(view, group_id):
+    for section in COMPONENT_SECTIONS:
+        for row in view.get(section, []):
+            if row["id"] == group_id:
+                return section, row
+    return None, None
+
+
+def group_snapshot(data, view, group_id):
+    """Full-detail snapshot of one supernode: its members and the components they link to"""
+    section, group = find_group(view, group_id)
+    if not group or not group.get("members"):
+        return None
+    members = set(group["members"])
+    detail = {"private_cloud": data.get("private_cloud") or {}}
+    if section == "network_switches":
+        switch_ids = members
+        linked = {
+            comp["id"] for other in ("servers", "storage", "backup") for comp in data.get(other, [])
+            if any(conn["switch_id"] in switch_ids for conn in comp.get("connected_switches") or ())
+        }
+        keep = {"network_switches": switch_ids, "servers": linked, "storage": linked, "backup": linked}
+    else:
+        switch_ids = {
+            conn["switch_id"] for comp in data.get(section, []) if comp["id"] in members
+            for conn in comp.get("connected_switches") or ()
+        }
+        keep = {other: set() for other in ("servers", "storage", "backup")}
+        keep[section] = members
+        keep["network_switches"] = switch_ids
+    for other in COMPONENT_SECTIONS:
+        detail[other] = [comp for comp in data.get(other, []) if comp["id"] in keep[other]]
+    return detail